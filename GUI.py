@@ -1,8 +1,5 @@
 import webbrowser
-from pathlib import Path
 
-# Used "tomlkit" instead of "toml" because it doesn't change formatting on "dump"
-import tomlkit
 from flask import (
     Flask,
     redirect,
@@ -69,11 +66,11 @@ def background_delete():
 
 @app.route("/settings", methods=["GET", "POST"])
 def settings():
-    config_load = tomlkit.loads(Path("config.toml").read_text())
+    config_load = gui.state.config
     config = gui.get_config(config_load)
 
     # Get checks for all values
-    checks = gui.get_checks()
+    checks = gui.state.checks
 
     if request.method == "POST":
         # Get data from form as dict
@@ -43,7 +43,7 @@ class TTSEngine:
         self.tts_module = tts_module()
         self.reddit_object = reddit_object
 
-        self.redditid = re.sub(r"[^\w\s-]", "", reddit_object["thread_id"])
+        self.redditid = reddit_object["safe_thread_id"]
         self.path = path + self.redditid + "/mp3"
         self.max_length = max_length
         self.length = 0
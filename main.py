@@ -18,8 +18,7 @@ from utils.id import id
 from utils.version import checkversion
 from video_creation.background import (
     chop_background,
-    download_background_audio,
-    download_background_video,
+    download_backgrounds,
     get_background_config,
 )
 from video_creation.final_video import make_final_video
@@ -55,8 +54,7 @@ def main(POST_ID=None) -> None:
         "video": get_background_config("video"),
         "audio": get_background_config("audio"),
     }
-    download_background_video(bg_config["video"])
-    download_background_audio(bg_config["audio"])
+    download_backgrounds(bg_config)
     chop_background(bg_config, length, reddit_object)
     make_final_video(number_of_comments, length, reddit_object, bg_config)
 
@@ -92,10 +92,7 @@ def get_subreddit_threads(POST_ID: str):
         threads = subreddit.hot(limit=25)
         submission = get_subreddit_undone(threads, subreddit)
 
-    if submission is None:
-        return get_subreddit_threads(POST_ID)  # submission already done. rerun
-
-    elif not submission.num_comments and not settings.config["settings"]["storymode"]:
+    if not submission.num_comments and not settings.config["settings"]["storymode"]:
         print_substep("No comments found. Skipping.")
         exit()
 
@@ -120,6 +117,7 @@ def get_subreddit_threads(POST_ID: str):
     content["thread_url"] = threadurl
     content["thread_title"] = submission.title
     content["thread_id"] = submission.id
+    content["safe_thread_id"] = re.sub(r"[^\w\s-]", "", submission.id)
     content["is_nsfw"] = submission.over_18
     content["comments"] = []
     if settings.config["settings"]["storymode"]:
@@ -153,6 +151,7 @@ def get_subreddit_threads(POST_ID: str):
                                     "comment_body": top_level_comment.body,
                                     "comment_url": top_level_comment.permalink,
                                     "comment_id": top_level_comment.id,
+                                    "comment_author": str(top_level_comment.author),
                                 }
                             )
 
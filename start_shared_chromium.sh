@@ -0,0 +1,3 @@
+#!/bin/sh
+# Starts a headless Chromium that several bots can share through cdp_endpoint = "http://localhost:9222"
+${CHROMIUM:-chromium} --headless=new --remote-debugging-port=${CDP_PORT:-9222} --user-data-dir="${CHROMIUM_PROFILE:-/tmp/rvmb-chromium}"
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import numpy as np
 import torch
 from transformers import AutoModel, AutoTokenizer
@@ -14,71 +16,70 @@ def mean_pooling(model_output, attention_mask):
     )
 
 
+# The model and keyword embeddings don't change between retries, so load/compute them once
+@lru_cache(maxsize=1)
+def _load_local_model():
+    tokenizer = AutoTokenizer.from_pretrained("sentence-transformers/all-MiniLM-L6-v2")
+    model = AutoModel.from_pretrained("sentence-transformers/all-MiniLM-L6-v2")
+    return tokenizer, model
+
+
+def _embed_local(sentences):
+    tokenizer, model = _load_local_model()
+    encoded = tokenizer(sentences, padding=True, truncation=True, return_tensors="pt")
+    with torch.no_grad():
+        embeddings = model(**encoded)
+    return mean_pooling(embeddings, encoded["attention_mask"])
+
+
+def _embed_gemini(sentences, model_name):
+    embeddings = [
+        genai.embed_content(model=model_name, content=text)["embedding"] for text in sentences
+    ]
+    return torch.from_numpy(np.asarray(embeddings, dtype=np.float32))
+
+
+@lru_cache(maxsize=8)
+def _keywords_embeddings(provider, model_name, keywords: tuple):
+    if provider == "gemini":
+        return _embed_gemini(list(keywords), model_name)
+    return _embed_local(list(keywords))
+
+
 # This function sort the given threads based on their total similarity with the given keywords
 def sort_by_similarity(thread_objects, keywords):
     global_provider = settings.config["ai"].get("provider", "local")
     provider = settings.config["ai"].get("ai_similarity_provider", global_provider)
+    model_name = None
     if provider == "gemini":
         genai.configure(api_key=settings.config["ai"].get("gemini_api_key"))
         model_name = settings.config["ai"].get("gemini_embedding_model", "models/embedding-001")
-    else:
-        tokenizer = AutoTokenizer.from_pretrained("sentence-transformers/all-MiniLM-L6-v2")
-        model = AutoModel.from_pretrained("sentence-transformers/all-MiniLM-L6-v2")
 
     # Transform the generator to a list of Submission Objects, so we can sort later based on context similarity to
     # keywords
     thread_objects = list(thread_objects)
 
-    threads_sentences = []
-    for i, thread in enumerate(thread_objects):
-        threads_sentences.append(" ".join([thread.title, thread.selftext]))
+    threads_sentences = [" ".join([thread.title, thread.selftext]) for thread in thread_objects]
 
     # Threads inference
     if provider == "gemini":
-        threads_embeddings = [
-            genai.embed_content(model=model_name, content=text)["embedding"]
-            for text in threads_sentences
-        ]
-        keywords_embeddings = [
-            genai.embed_content(model=model_name, content=text)["embedding"]
-            for text in keywords
-        ]
+        threads_embeddings = _embed_gemini(threads_sentences, model_name)
     else:
-        encoded_threads = tokenizer(
-            threads_sentences, padding=True, truncation=True, return_tensors="pt"
-        )
-        with torch.no_grad():
-            threads_embeddings = model(**encoded_threads)
-        threads_embeddings = mean_pooling(
-            threads_embeddings, encoded_threads["attention_mask"]
-        )
-
-        # Keywords inference
-        encoded_keywords = tokenizer(
-            keywords, padding=True, truncation=True, return_tensors="pt"
-        )
-        with torch.no_grad():
-            keywords_embeddings = model(**encoded_keywords)
-        keywords_embeddings = mean_pooling(
-            keywords_embeddings, encoded_keywords["attention_mask"]
-        )
-
-    # Compare every keyword w/ every thread embedding
-    threads_embeddings_tensor = torch.tensor(threads_embeddings)
-    total_scores = torch.zeros(threads_embeddings_tensor.shape[0])
-    cosine_similarity = torch.nn.CosineSimilarity()
-    for keyword_embedding in keywords_embeddings:
-        keyword_embedding = torch.tensor(keyword_embedding).repeat(
-            threads_embeddings_tensor.shape[0], 1
-        )
-        similarity = cosine_similarity(keyword_embedding, threads_embeddings_tensor)
-        total_scores += similarity
+        threads_embeddings = _embed_local(threads_sentences)
+
+    # Keywords inference
+    keywords_embeddings = _keywords_embeddings(provider, model_name, tuple(keywords))
+
+    # Compare every keyword w/ every thread embedding in a single matrix product
+    threads_normalized = torch.nn.functional.normalize(threads_embeddings, dim=1)
+    keywords_normalized = torch.nn.functional.normalize(keywords_embeddings, dim=1)
+    total_scores = (threads_normalized @ keywords_normalized.T).sum(dim=1)
 
     similarity_scores, indices = torch.sort(total_scores, descending=True)
 
     threads_sentences = np.array(threads_sentences)[indices.numpy()]
 
-    thread_objects = np.array(thread_objects)[indices.numpy()].tolist()
+    thread_objects = [thread_objects[i] for i in indices.tolist()]
 
     # print('Similarity Thread Ranking')
     # for i, thread in enumerate(thread_objects):
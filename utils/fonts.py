@@ -1,4 +1,12 @@
-from PIL.ImageFont import FreeTypeFont, ImageFont
+from functools import lru_cache
+
+from PIL.ImageFont import FreeTypeFont, ImageFont, truetype
+
+
+@lru_cache(maxsize=64)
+def load_font(path: str, size: int) -> FreeTypeFont:
+    """Loads a TrueType font, parsing each (path, size) from disk only once"""
+    return truetype(path, size)
 
 
 def getsize(font: ImageFont | FreeTypeFont, text: str):
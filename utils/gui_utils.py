@@ -1,15 +1,24 @@
-import json
 import re
+import string
+from functools import cached_property
 from pathlib import Path
 
+import orjson
 import toml
 import tomlkit
 from flask import flash
 
+_BACKGROUNDS_JSON = Path(__file__).resolve().parent / "backgrounds.json"
+_CONFIG_TEMPLATE = Path(__file__).resolve().parent / ".config.template.toml"
+
+_YOUTUBE_ID = re.compile(r"(?:\/|%3D|v=|vi=)([0-9A-z\-_]{11})(?:[%#?&]|$)")
+_FILENAME_CHARS = frozenset(string.ascii_letters + string.digits + string.whitespace + "_-")
+_SPACE_TO_UNDERSCORE = str.maketrans({" ": "_"})
+
 
 # Get validation checks from template
 def get_checks():
-    template = toml.load("utils/.config.template.toml")
+    template = toml.load(_CONFIG_TEMPLATE)
     checks = {}
 
     def unpack_checks(obj: dict):
@@ -24,6 +33,24 @@ def get_checks():
     return checks
 
 
+# Parsed GUI state, loaded lazily once per process and shared across requests
+class GuiState:
+    @cached_property
+    def checks(self) -> dict:
+        return get_checks()
+
+    @cached_property
+    def config(self):
+        return tomlkit.loads(Path("config.toml").read_text())
+
+    def invalidate(self, *names: str) -> None:
+        for name in names:
+            self.__dict__.pop(name, None)
+
+
+state = GuiState()
+
+
 # Get current config (from config.toml) as dict
 def get_config(obj: dict, done={}):
     for key in obj.keys():
@@ -35,16 +62,33 @@ def get_config(obj: dict, done={}):
     return done
 
 
+# Accepted spellings for boolean form values ("True"/"False" from checkboxes)
+_TRUE = frozenset({"true", "yes", "1", "on", "t", "y"})
+_FALSE = frozenset({"false", "no", "0", "off", "f", "n"})
+
+
+# Converts a form value to bool, unlike bool() which is True for "False"
+def _safe_str_to_bool(val) -> bool:
+    if isinstance(val, bool):
+        return val
+    lowered = val.lower() if isinstance(val, str) else str(val).lower()
+    if lowered in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    raise ValueError(f"{val!r} is not a boolean")
+
+
 # Checks if value is valid
 def check(value, checks):
     incorrect = False
 
-    if value == "False":
-        value = ""
-
     if not incorrect and "type" in checks:
         try:
-            value = eval(checks["type"])(value)
+            if checks["type"] == "bool":
+                value = _safe_str_to_bool(value)
+            else:
+                value = eval(checks["type"])(value)
         except Exception:
             incorrect = True
 
@@ -103,6 +147,8 @@ def modify_settings(data: dict, config_load, checks: dict):
     # Remove empty/incorrect key-value pairs
     data = {key: value for key, value in data.items() if value and key in checks.keys()}
 
+    before = tomlkit.dumps(config_load)
+
     # Validate values
     for name in data.keys():
         value = check(data[name], checks[name])
@@ -114,11 +160,14 @@ def modify_settings(data: dict, config_load, checks: dict):
             # Value is valid
             modify_config(config_load, name, value)
 
-    # Save changes in config.toml
-    with Path("config.toml").open("w") as toml_file:
-        toml_file.write(tomlkit.dumps(config_load))
-
-    flash("Settings saved!")
+    # Save changes in config.toml, unless nothing actually changed
+    after = tomlkit.dumps(config_load)
+    if before != after:
+        Path("config.toml").write_text(after)
+        state.invalidate("config")
+        flash("Settings saved!")
+    else:
+        flash("No changes to save.")
 
     return get_config(config_load)
 
@@ -126,23 +175,24 @@ def modify_settings(data: dict, config_load, checks: dict):
 # Delete background video
 def delete_background(key):
     # Read backgrounds.json
-    with open("utils/backgrounds.json", "r", encoding="utf-8") as backgrounds:
-        data = json.load(backgrounds)
+    with open(_BACKGROUNDS_JSON, "rb") as backgrounds:
+        data = orjson.loads(backgrounds.read())
 
     # Remove background from backgrounds.json
-    with open("utils/backgrounds.json", "w", encoding="utf-8") as backgrounds:
-        if data.pop(key, None):
-            json.dump(data, backgrounds, ensure_ascii=False, indent=4)
-        else:
-            flash("Couldn't find this background. Try refreshing the page.", "error")
-            return
+    if not data.pop(key, None):
+        flash("Couldn't find this background. Try refreshing the page.", "error")
+        return
+
+    with open(_BACKGROUNDS_JSON, "wb") as backgrounds:
+        backgrounds.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
     # Remove background video from ".config.template.toml"
-    config = tomlkit.loads(Path("utils/.config.template.toml").read_text())
+    config = tomlkit.loads(_CONFIG_TEMPLATE.read_text())
     config["settings"]["background"]["background_choice"]["options"].remove(key)
 
-    with Path("utils/.config.template.toml").open("w") as toml_file:
+    with _CONFIG_TEMPLATE.open("w") as toml_file:
         toml_file.write(tomlkit.dumps(config))
+    state.invalidate("checks")
 
     flash(f'Successfully removed "{key}" background!')
 
@@ -150,13 +200,13 @@ def delete_background(key):
 # Add background video
 def add_background(youtube_uri, filename, citation, position):
     # Validate YouTube URI
-    regex = re.compile(r"(?:\/|%3D|v=|vi=)([0-9A-z\-_]{11})(?:[%#?&]|$)").search(youtube_uri)
+    match = _YOUTUBE_ID.search(youtube_uri)
 
-    if not regex:
+    if not match:
         flash("YouTube URI is invalid!", "error")
         return
 
-    youtube_uri = f"https://www.youtube.com/watch?v={regex.group(1)}"
+    youtube_uri = "https://www.youtube.com/watch?v=" + match.group(1)
 
     # Check if position is valid
     if position == "" or position == "center":
@@ -170,42 +220,38 @@ def add_background(youtube_uri, filename, citation, position):
         return
 
     # Sanitize filename
-    regex = re.compile(r"^([a-zA-Z0-9\s_-]{1,100})$").match(filename)
-
-    if not regex:
+    if not 1 <= len(filename) <= 100 or not _FILENAME_CHARS.issuperset(filename):
         flash("Filename is invalid!", "error")
         return
 
-    filename = filename.replace(" ", "_")
+    filename = filename.translate(_SPACE_TO_UNDERSCORE)
 
     # Check if background doesn't already exist
-    with open("utils/backgrounds.json", "r", encoding="utf-8") as backgrounds:
-        data = json.load(backgrounds)
+    with open(_BACKGROUNDS_JSON, "rb") as backgrounds:
+        data = orjson.loads(backgrounds.read())
 
         # Check if key isn't already taken
-        if filename in list(data.keys()):
+        if filename in data:
             flash("Background video with this name already exist!", "error")
             return
 
         # Check if the YouTube URI isn't already used under different name
-        if youtube_uri in [data[i][0] for i in list(data.keys())]:
+        if youtube_uri in {background[0] for background in data.values()}:
             flash("Background video with this YouTube URI is already added!", "error")
             return
 
     # Add background video to json file
-    with open("utils/backgrounds.json", "r+", encoding="utf-8") as backgrounds:
-        data = json.load(backgrounds)
-
-        data[filename] = [youtube_uri, filename + ".mp4", citation, position]
-        backgrounds.seek(0)
-        json.dump(data, backgrounds, ensure_ascii=False, indent=4)
+    data[filename] = [youtube_uri, filename + ".mp4", citation, position]
+    with open(_BACKGROUNDS_JSON, "wb") as backgrounds:
+        backgrounds.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
     # Add background video to ".config.template.toml"
-    config = tomlkit.loads(Path("utils/.config.template.toml").read_text())
+    config = tomlkit.loads(_CONFIG_TEMPLATE.read_text())
     config["settings"]["background"]["background_choice"]["options"].append(filename)
 
-    with Path("utils/.config.template.toml").open("w") as toml_file:
+    with _CONFIG_TEMPLATE.open("w") as toml_file:
         toml_file.write(tomlkit.dumps(config))
+    state.invalidate("checks")
 
     flash(f'Added "{citation}-{filename}.mp4" as a new background video!')
 
@@ -1,5 +1,3 @@
-import re
-
 from utils.console import print_substep
 
 
@@ -7,6 +5,6 @@ def id(reddit_obj: dict):
     """
     This function takes a reddit object and returns the post id
     """
-    id = re.sub(r"[^\w\s-]", "", reddit_obj["thread_id"])
+    id = reddit_obj["safe_thread_id"]
     print_substep(f"Thread ID is {id}", style="bold blue")
     return id
@@ -1,12 +1,11 @@
 import os
-import re
 import textwrap
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 from rich.progress import track
 
 from TTS.engine_wrapper import process_text
-from utils.fonts import getheight, getsize
+from utils.fonts import getheight, getsize, load_font
 
 
 def draw_multiple_line_text(
@@ -19,8 +18,9 @@ def draw_multiple_line_text(
     font_height = getheight(font, text)
     image_width, image_height = image.size
     lines = textwrap.wrap(text, width=wrap)
-    y = (image_height / 2) - (((font_height + (len(lines) * padding) / len(lines)) * len(lines)) / 2)
+    y = (image_height - len(lines) * (font_height + padding)) / 2
     for line in lines:
+        # the height of each line is measured too, lines with accents or emoji need more room
         line_width, line_height = getsize(font, line)
         if transparent:
             shadowcolor = "black"
@@ -58,12 +58,12 @@ def imagemaker(theme, reddit_obj: dict, txtclr, padding=5, transparent=False) ->
     Render Images for video
     """
     texts = reddit_obj["thread_post"]
-    id = re.sub(r"[^\w\s-]", "", reddit_obj["thread_id"])
+    id = reddit_obj["safe_thread_id"]
 
     if transparent:
-        font = ImageFont.truetype(os.path.join("fonts", "Roboto-Bold.ttf"), 100)
+        font = load_font(os.path.join("fonts", "Roboto-Bold.ttf"), 100)
     else:
-        font = ImageFont.truetype(os.path.join("fonts", "Roboto-Regular.ttf"), 100)
+        font = load_font(os.path.join("fonts", "Roboto-Regular.ttf"), 100)
     size = (1920, 1080)
 
     image = Image.new("RGBA", size, theme)
@@ -1,5 +1,196 @@
+import atexit
+import hashlib
+import os
+import re
+import time
+from pathlib import Path
+from queue import Empty, SimpleQueue
+from urllib.parse import urlsplit
+
+import orjson
+from playwright.sync_api import Browser, BrowserContext, Error, Route, sync_playwright
+
+
 def clear_cookie_by_name(context, cookie_cleared_name):
     cookies = context.cookies()
     filtered_cookies = [cookie for cookie in cookies if cookie["name"] != cookie_cleared_name]
     context.clear_cookies()
     context.add_cookies(filtered_cookies)
+
+
+# Where Reddit's scripts, styles, fonts and images are kept between page loads and runs
+STATIC_CACHE_DIR = Path("assets/cache/playwright")
+# Files older than this are downloaded again
+STATIC_CACHE_MAX_AGE = 7 * 24 * 60 * 60
+# The oldest files are removed once the cache grows past this many bytes
+STATIC_CACHE_MAX_BYTES = 256 * 1024 * 1024
+_STATIC_RESOURCE_TYPES = frozenset({"script", "stylesheet", "font", "image"})
+_TRACKERS = re.compile(r"googletagmanager|google-analytics|doubleclick|reddit-static-metrics")
+
+
+def _serve_cached(route: Route):
+    request = route.request
+    if request.resource_type not in _STATIC_RESOURCE_TYPES or request.method != "GET":
+        route.fallback()
+        return
+    key = hashlib.blake2b(request.url.encode(), digest_size=16).hexdigest()
+    body_path = STATIC_CACHE_DIR / f"{key}.bin"
+    headers_path = STATIC_CACHE_DIR / f"{key}.json"
+    if (
+        headers_path.is_file()
+        and body_path.is_file()
+        and time.time() - body_path.stat().st_mtime < STATIC_CACHE_MAX_AGE
+    ):
+        route.fulfill(body=body_path.read_bytes(), headers=orjson.loads(headers_path.read_bytes()))
+        return
+    try:
+        response = route.fetch()
+    except Error:
+        # left to the browser, which fails the request the way it normally would
+        route.fallback()
+        return
+    body = response.body()
+    if response.status == 200:
+        STATIC_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        body_path.write_bytes(body)
+        # the body is stored decompressed, so its original encoding and length don't apply
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in ("content-encoding", "content-length")
+        }
+        headers_path.write_bytes(orjson.dumps(headers))
+    route.fulfill(response=response, body=body)
+
+
+def _prune_static_cache():
+    """Removes the expired files, then the oldest ones until the cache fits STATIC_CACHE_MAX_BYTES"""
+    if not STATIC_CACHE_DIR.is_dir():
+        return
+    now = time.time()
+    entries = []
+    for body_path in STATIC_CACHE_DIR.glob("*.bin"):
+        stat = body_path.stat()
+        entries.append((stat.st_mtime, stat.st_size, body_path))
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, body_path in sorted(entries):
+        if now - mtime < STATIC_CACHE_MAX_AGE and total <= STATIC_CACHE_MAX_BYTES:
+            break
+        body_path.unlink(missing_ok=True)
+        body_path.with_suffix(".json").unlink(missing_ok=True)
+        total -= size
+
+
+def cache_static_assets(context: BrowserContext):
+    """Serves Reddit's static files from STATIC_CACHE_DIR after their first download, and drops
+    requests to trackers.
+
+    Routing turns Chromium's own HTTP cache off, so without this every comment page would
+    download the same bundles again.
+    """
+    _prune_static_cache()
+    # the route added last is tried first
+    context.route("**/*", _serve_cached)
+    context.route(_TRACKERS, lambda route: route.abort())
+
+
+_MEDIA_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+# Reddit's own domains, the media in posts and comments is served from redd.it and redditmedia.com
+_REDDIT_DOMAINS = ("reddit.com", "redditstatic.com", "redd.it", "redditmedia.com")
+
+
+def _is_reddit_host(url: str) -> bool:
+    host = urlsplit(url).hostname or ""
+    return any(host == domain or host.endswith("." + domain) for domain in _REDDIT_DOMAINS)
+
+
+def _abort_outside_media(route: Route):
+    request = route.request
+    if request.resource_type in _MEDIA_RESOURCE_TYPES and not _is_reddit_host(request.url):
+        route.abort()
+    else:
+        route.fallback()
+
+
+def block_outside_media(context: BrowserContext):
+    """Drops the images, videos, fonts and styles that don't come from Reddit's own domains, like
+    the thumbnails and players of linked sites. Only for pages whose screenshots show nothing but
+    comments.
+    """
+    context.route("**/*", _abort_outside_media)
+
+
+# How many contexts a browser serves before it's replaced by a fresh one
+BROWSER_POOL_RECYCLE_AFTER = int(os.environ.get("BROWSER_POOL_RECYCLE_AFTER", 100))
+
+
+class BrowserPool:
+    """Headless Chromium browsers that keep running between screenshot runs, so every post only
+    opens a new context instead of launching a whole browser.
+
+    Browsers are launched lazily and closed when the program exits. The sync Playwright API is
+    bound to the thread that started it, so the pool has to be used from a single thread.
+
+    With a cdp_endpoint, an already running Chromium is shared instead, see
+    start_shared_chromium.sh. Every job connected to it only adds its own contexts, not another
+    browser with its own GPU and network processes.
+    """
+
+    def __init__(self, recycle_after: int = BROWSER_POOL_RECYCLE_AFTER):
+        self.recycle_after = recycle_after
+        self._playwright = None
+        self._idle = SimpleQueue()
+        self._served = {}
+        self._shared = None
+
+    def _start(self):
+        if self._playwright is None:
+            # started without the context manager, so it outlives a single run
+            self._playwright = sync_playwright().start()
+            atexit.register(self.close)
+
+    def acquire(self, cdp_endpoint: str = "") -> Browser:
+        if cdp_endpoint:
+            if self._shared is None or not self._shared.is_connected():
+                self._start()
+                self._shared = self._playwright.chromium.connect_over_cdp(cdp_endpoint)
+            return self._shared
+        try:
+            browser = self._idle.get_nowait()
+        except Empty:
+            self._start()
+            # headless=False will show the browser for debugging purposes
+            browser = self._playwright.chromium.launch(headless=True)
+            self._served[browser] = 0
+        self._served[browser] += 1
+        return browser
+
+    def release(self, browser: Browser):
+        if browser is self._shared:
+            # the shared browser belongs to whoever started it, only our contexts get closed
+            return
+        if self._served[browser] >= self.recycle_after or not browser.is_connected():
+            # Chromium's memory use keeps creeping up over a long session, so it's replaced
+            # every so often
+            del self._served[browser]
+            browser.close()
+        else:
+            self._idle.put(browser)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                break
+        self._served.clear()
+        if self._shared is not None:
+            # only disconnects, the shared browser keeps running for the other jobs
+            self._shared.close()
+            self._shared = None
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+
+browser_pool = BrowserPool()
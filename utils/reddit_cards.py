@@ -0,0 +1,104 @@
+import os
+import textwrap
+from typing import Optional, Tuple
+
+from PIL import Image, ImageDraw
+from rich.progress import track
+
+from utils.fonts import getheight, load_font
+from utils.translate import translate_texts
+
+CARD_WIDTH = 1200
+CARD_PADDING = 40
+CARD_RADIUS = 24
+
+
+def render_card(
+    text: str,
+    path: str,
+    bgcolor: Tuple,
+    txtcolor: Tuple,
+    header: Optional[str] = None,
+    bold: bool = False,
+    font_size: int = 44,
+) -> None:
+    """Draws text, under an optional smaller header line, on a rounded card like Reddit's and
+    saves it as a PNG at path.
+    """
+    font = load_font(
+        os.path.join("fonts", "Roboto-Bold.ttf" if bold else "Roboto-Regular.ttf"), font_size
+    )
+    header_font = load_font(os.path.join("fonts", "Roboto-Bold.ttf"), font_size * 2 // 3)
+    text_width = CARD_WIDTH - 2 * CARD_PADDING
+    # wrapped on the average character width of this text, measuring it only once
+    chars_per_line = max(1, int(text_width * len(text) / max(font.getlength(text), 1)))
+    lines = [
+        line
+        for paragraph in text.splitlines()
+        for line in (textwrap.wrap(paragraph, width=chars_per_line) or [""])
+    ]
+    line_height = getheight(font, "Ay") + font_size // 3
+    header_height = getheight(header_font, "Ay") + font_size // 2 if header else 0
+
+    height = 2 * CARD_PADDING + header_height + len(lines) * line_height
+    image = Image.new("RGBA", (CARD_WIDTH, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    draw.rounded_rectangle((0, 0, CARD_WIDTH - 1, height - 1), CARD_RADIUS, fill=bgcolor)
+    y = CARD_PADDING
+    if header:
+        draw.text((CARD_PADDING, y), header, font=header_font, fill=txtcolor)
+        y += header_height
+    for line in lines:
+        draw.text((CARD_PADDING, y), line, font=font, fill=txtcolor)
+        y += line_height
+    image.save(path)
+
+
+def render_reddit_cards(
+    reddit_object: dict, screenshot_num: int, bgcolor: Tuple, txtcolor: Tuple, lang: str = ""
+) -> None:
+    """Draws the post's title, story and comments as cards with Pillow, to the same files the
+    browser screenshots are saved as, so no browser has to be started at all.
+
+    Args:
+        reddit_object (dict): Reddit object received from reddit/subreddit.py
+        screenshot_num (int): Number of comments to draw
+        lang (str, optional): Language to translate the texts to, left as they are if empty
+    """
+    reddit_id = reddit_object["safe_thread_id"]
+    story = reddit_object.get("thread_post")
+    comments = reddit_object["comments"][:screenshot_num]
+    texts = [reddit_object["thread_title"]]
+    if isinstance(story, str):
+        texts.append(story)
+    texts += [comment["comment_body"] for comment in comments]
+    if lang:
+        texts = translate_texts(texts, lang)
+
+    render_card(
+        texts[0],
+        f"assets/temp/{reddit_id}/png/title.png",
+        bgcolor,
+        txtcolor,
+        bold=True,
+        font_size=56,
+    )
+    if isinstance(story, str):
+        render_card(
+            texts[1],
+            f"assets/temp/{reddit_id}/png/story_content.png",
+            bgcolor,
+            txtcolor,
+        )
+    comment_texts = texts[len(texts) - len(comments) :]
+    for idx, (comment, text) in enumerate(
+        track(list(zip(comments, comment_texts)), "Drawing comments...")
+    ):
+        author = comment.get("comment_author")
+        render_card(
+            text,
+            f"assets/temp/{reddit_id}/png/comment_{idx}.png",
+            bgcolor,
+            txtcolor,
+            header=f"u/{author}" if author else None,
+        )
@@ -14,11 +14,15 @@ config = dict  # autocomplete
 def crawl(obj: dict, func=lambda x, y: print(x, y, end="\n"), path=None):
     if path is None:  # path Default argument value is mutable
         path = []
-    for key in obj.keys():
-        if type(obj[key]) is dict:
-            crawl(obj[key], func, path + [key])
+    for key, value in obj.items():
+        # Exact type check on purpose: toml loads inline tables (the per-setting checks)
+        # as a dict subclass, and those must be passed to func instead of crawled into.
+        if type(value) is dict:
+            path.append(key)
+            crawl(value, func, path)
+            path.pop()
             continue
-        func(path + [key], obj[key])
+        func(path + [key], value)
 
 
 def check(value, checks, name):
@@ -1,96 +1,115 @@
-import json
-from os.path import exists
+from pathlib import Path
+from typing import Iterable
+
+import orjson
 
 from utils import settings
 from utils.ai_methods import sort_by_similarity
 from utils.console import print_substep
 
+VALID_TIME_FILTERS = [
+    "day",
+    "hour",
+    "month",
+    "week",
+    "year",
+    "all",
+]  # set doesn't have __getitem__
+
 
-def get_subreddit_undone(submissions: list, subreddit, times_checked=0, similarity_scores=None):
+def get_subreddit_undone(
+    submissions: Iterable, subreddit, times_checked=0, similarity_scores=None, done_ids=None
+):
     """_summary_
 
     Args:
-        submissions (list): List of posts that are going to potentially be generated into a video
+        submissions (Iterable): Posts that are going to potentially be generated into a video, iterated lazily
         subreddit (praw.Reddit.SubredditHelper): Chosen subreddit
+        done_ids (frozenset, optional): IDs of the videos already done, read from videos.json if not given
 
     Returns:
-        Any: The submission that has not been done
+        Any: The submission that has not been done, the program exits if there is none
     """
-    # Second try of getting a valid Submission
-    if times_checked and settings.config["ai"]["ai_similarity_enabled"]:
-        print("Sorting based on similarity for a different date filter and thread limit..")
-        submissions = sort_by_similarity(
-            submissions, keywords=settings.config["ai"]["ai_similarity_enabled"]
-        )
-
-    # recursively checks if the top submission in the list was already done.
-    if not exists("./video_creation/data/videos.json"):
-        with open("./video_creation/data/videos.json", "w+") as f:
-            json.dump([], f)
-    with open("./video_creation/data/videos.json", "r", encoding="utf-8") as done_vids_raw:
-        done_videos = json.load(done_vids_raw)
+    if done_ids is None:
+        videos_json = Path("./video_creation/data/videos.json")
+        if not videos_json.exists():
+            videos_json.write_bytes(b"[]")
+        done_videos = orjson.loads(videos_json.read_bytes())
+        done_ids = frozenset(video["id"] for video in done_videos)
+
+    # checks the submissions, then the top submissions of each following time filter, until one
+    # that was not already done is found.
+    for index in range(times_checked, len(VALID_TIME_FILTERS)):
+        if index != times_checked:
+            print("all submissions have been done going by top submission order")
+            submissions = subreddit.top(
+                time_filter=VALID_TIME_FILTERS[index],
+                limit=(50 if int(index) == 0 else index + 1 * 50),
+            )  # all the videos in hot have already been done
+            similarity_scores = None
+
+        # Second try of getting a valid Submission
+        # Only similarity sorting needs the whole listing up front; otherwise the PRAW listing is
+        # consumed lazily and stops fetching pages at the first usable submission.
+        if index and settings.config["ai"]["ai_similarity_enabled"]:
+            print("Sorting based on similarity for a different date filter and thread limit..")
+            keywords = settings.config["ai"]["ai_similarity_keywords"].split(",")
+            submissions, similarity_scores = sort_by_similarity(
+                submissions, keywords=[keyword.strip() for keyword in keywords]
+            )
+
+        undone = _first_undone(submissions, done_ids, similarity_scores)
+        if undone is not None:
+            return undone
+
+    # every listing was checked, fetching them again would only find the same submissions
+    print_substep("All submissions have been done. Try again later or pick another subreddit.")
+    exit()
+
+
+def _first_undone(submissions: Iterable, done_ids: frozenset, similarity_scores=None):
+    """Returns the first submission that can be made into a video, or None if there is none"""
+    storymode = settings.config["settings"]["storymode"]
+    min_comments = int(settings.config["reddit"]["thread"]["min_comments"])
+    allow_nsfw = settings.config["settings"].get("allow_nsfw", False)
+    storymode_max_length = settings.config["settings"].get("storymode_max_length")
+
+    # Cheapest checks first, so done/pinned/NSFW posts never reach the text checks below.
     for i, submission in enumerate(submissions):
-        if already_done(done_videos, submission):
+        if str(submission) in done_ids:
             continue
-        if submission.over_18:
-            try:
-                if not settings.config["settings"]["allow_nsfw"]:
-                    print_substep("NSFW Post Detected. Skipping...")
-                    continue
-            except AttributeError:
-                print_substep("NSFW settings not defined. Skipping NSFW post...")
         if submission.stickied:
             print_substep("This post was pinned by moderators. Skipping...")
             continue
-        if (
-            submission.num_comments <= int(settings.config["reddit"]["thread"]["min_comments"])
-            and not settings.config["settings"]["storymode"]
-        ):
+        if submission.over_18 and not allow_nsfw:
+            print_substep("NSFW Post Detected. Skipping...")
+            continue
+        if storymode and not submission.is_self:
+            continue
+        if submission.num_comments <= min_comments and not storymode:
             print_substep(
-                f'This post has under the specified minimum of comments ({settings.config["reddit"]["thread"]["min_comments"]}). Skipping...'
+                f"This post has under the specified minimum of comments ({min_comments}). Skipping..."
             )
             continue
-        if settings.config["settings"]["storymode"]:
-            if not submission.selftext:
+        if storymode:
+            # read once, each attribute access goes through PRAW's lazy __getattr__
+            selftext_length = len(submission.selftext)
+            if not selftext_length:
                 print_substep("You are trying to use story mode on post with no post text")
                 continue
             else:
                 # Check for the length of the post text
-                if len(submission.selftext) > (
-                    settings.config["settings"]["storymode_max_length"] or 2000
-                ):
+                if selftext_length > (storymode_max_length or 2000):
                     print_substep(
-                        f"Post is too long ({len(submission.selftext)}), try with a different post. ({settings.config['settings']['storymode_max_length']} character limit)"
+                        f"Post is too long ({selftext_length}), try with a different post. ({storymode_max_length} character limit)"
                     )
                     continue
-                elif len(submission.selftext) < 30:
+                elif selftext_length < 30:
                     continue
-        if settings.config["settings"]["storymode"] and not submission.is_self:
-            continue
         if similarity_scores is not None:
             return submission, similarity_scores[i].item()
         return submission
-    print("all submissions have been done going by top submission order")
-    VALID_TIME_FILTERS = [
-        "day",
-        "hour",
-        "month",
-        "week",
-        "year",
-        "all",
-    ]  # set doesn't have __getitem__
-    index = times_checked + 1
-    if index == len(VALID_TIME_FILTERS):
-        print("All submissions have been done.")
-
-    return get_subreddit_undone(
-        subreddit.top(
-            time_filter=VALID_TIME_FILTERS[index],
-            limit=(50 if int(index) == 0 else index + 1 * 50),
-        ),
-        subreddit,
-        times_checked=index,
-    )  # all the videos in hot have already been done
+    return None
 
 
 def already_done(done_videos: list, submission) -> bool:
@@ -104,7 +123,5 @@ def already_done(done_videos: list, submission) -> bool:
         Boolean: Whether the video was found in the list
     """
 
-    for video in done_videos:
-        if video["id"] == str(submission):
-            return True
-    return False
+    submission_id = str(submission)
+    return any(video["id"] == submission_id for video in done_videos)
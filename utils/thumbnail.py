@@ -1,8 +1,10 @@
-from PIL import ImageDraw, ImageFont
+from PIL import ImageDraw
+
+from utils.fonts import load_font
 
 
 def create_thumbnail(thumbnail, font_family, font_size, font_color, width, height, title):
-    font = ImageFont.truetype(font_family + ".ttf", font_size)
+    font = load_font(font_family + ".ttf", font_size)
     Xaxis = width - (width * 0.2)  # 20% of the width
     sizeLetterXaxis = font_size * 0.5  # 50% of the font size
     XaxisLetterQty = round(Xaxis / sizeLetterXaxis)  # Quantity of letters that can fit in the X axis
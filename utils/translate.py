@@ -0,0 +1,52 @@
+from typing import List
+
+import translators
+
+# Google Translate refuses texts over 5000 characters
+MAX_BATCH_CHARS = 4500
+_SEPARATOR = "\n⁂\n"
+
+
+def _batches(texts: List[str]) -> List[List[str]]:
+    batches = [[]]
+    length = 0
+    for text in texts:
+        if batches[-1] and length + len(_SEPARATOR) + len(text) > MAX_BATCH_CHARS:
+            batches.append([])
+            length = 0
+        batches[-1].append(text)
+        length += len(_SEPARATOR) + len(text)
+    return batches
+
+
+def _translate_one_by_one(texts: List[str], lang: str) -> List[str]:
+    return [
+        translators.translate_text(text, translator="google", to_language=lang) for text in texts
+    ]
+
+
+def translate_texts(texts: List[str], lang: str) -> List[str]:
+    """Translates the texts to lang in as few requests as possible.
+
+    The texts are joined on a separator line into batches under Google's length limit. A batch
+    that fails or doesn't come back in as many parts is translated text by text instead.
+
+    Returns:
+        List[str]: The translated texts, in order
+    """
+    translated = []
+    for batch in _batches(texts):
+        if len(batch) == 1:
+            translated += _translate_one_by_one(batch, lang)
+            continue
+        try:
+            parts = translators.translate_text(
+                _SEPARATOR.join(batch), translator="google", to_language=lang
+            ).split(_SEPARATOR.strip())
+        except Exception:
+            parts = []
+        if len(parts) == len(batch):
+            translated += [part.strip() for part in parts]
+        else:
+            translated += _translate_one_by_one(batch, lang)
+    return translated
@@ -1,6 +1,7 @@
-import json
 import time
+from pathlib import Path
 
+import orjson
 from praw.models import Submission
 
 from utils import settings
@@ -19,8 +20,7 @@ def check_done(
     Returns:
         Submission|None: Reddit object in args
     """
-    with open("./video_creation/data/videos.json", "r", encoding="utf-8") as done_vids_raw:
-        done_videos = json.load(done_vids_raw)
+    done_videos = orjson.loads(Path("./video_creation/data/videos.json").read_bytes())
     for video in done_videos:
         if video["id"] == str(redditobj):
             if settings.config["reddit"]["thread"]["post_id"]:
@@ -43,18 +43,17 @@ def save_data(subreddit: str, filename: str, reddit_title: str, reddit_id: str,
         @param reddit_id:
         @param reddit_title:
     """
-    with open("./video_creation/data/videos.json", "r+", encoding="utf-8") as raw_vids:
-        done_vids = json.load(raw_vids)
-        if reddit_id in [video["id"] for video in done_vids]:
-            return  # video already done but was specified to continue anyway in the config file
-        payload = {
-            "subreddit": subreddit,
-            "id": reddit_id,
-            "time": str(int(time.time())),
-            "background_credit": credit,
-            "reddit_title": reddit_title,
-            "filename": filename,
-        }
-        done_vids.append(payload)
-        raw_vids.seek(0)
-        json.dump(done_vids, raw_vids, ensure_ascii=False, indent=4)
+    videos_json = Path("./video_creation/data/videos.json")
+    done_vids = orjson.loads(videos_json.read_bytes())
+    if any(video["id"] == reddit_id for video in done_vids):
+        return  # video already done but was specified to continue anyway in the config file
+    payload = {
+        "subreddit": subreddit,
+        "id": reddit_id,
+        "time": str(int(time.time())),
+        "background_credit": credit,
+        "reddit_title": reddit_title,
+        "filename": filename,
+    }
+    done_vids.append(payload)
+    videos_json.write_bytes(orjson.dumps(done_vids, option=orjson.OPT_INDENT_2))
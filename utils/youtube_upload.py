@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import os
+from pathlib import Path
 from typing import List, Optional
 
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from googleapiclient.discovery import Resource, build
 from googleapiclient.http import MediaFileUpload
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
@@ -13,12 +14,21 @@ from google.auth.transport.requests import Request
 SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
 CLIENT_SECRETS_FILE = "youtube_client_secrets.json"
 TOKEN_FILE = "youtube_token.json"
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+_credentials: Optional[Credentials] = None
+_service: Optional[Resource] = None
 
 
 def _get_service():
-    """Return an authenticated YouTube service object."""
-    creds: Optional[Credentials] = None
-    if os.path.exists(TOKEN_FILE):
+    """Return an authenticated YouTube service object, reused while its token stays valid."""
+    global _credentials, _service
+    if _service is not None and _credentials is not None and _credentials.valid:
+        return _service
+
+    creds = _credentials
+    if creds is None and os.path.exists(TOKEN_FILE):
         creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
@@ -26,9 +36,11 @@ def _get_service():
         else:
             flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRETS_FILE, SCOPES)
             creds = flow.run_console()
-        with open(TOKEN_FILE, "w") as token:
-            token.write(creds.to_json())
-    return build("youtube", "v3", credentials=creds)
+        Path(TOKEN_FILE).write_bytes(creds.to_json().encode("utf-8"))
+    if _service is None or creds is not _credentials:
+        _service = build("youtube", "v3", credentials=creds, static_discovery=True)
+    _credentials = creds
+    return _service
 
 
 def upload_to_youtube(
@@ -45,9 +57,15 @@ def upload_to_youtube(
         "snippet": {"title": title, "description": description, "tags": tags or []},
         "status": {"privacyStatus": privacy_status},
     }
-    media = MediaFileUpload(filepath)
+    # Upload in resumable chunks so the whole video never has to sit in memory
+    media = MediaFileUpload(
+        filepath, mimetype="video/mp4", chunksize=UPLOAD_CHUNK_SIZE, resumable=True
+    )
     request = youtube.videos().insert(
         part="snippet,status", body=body, media_body=media
     )
-    return request.execute()
+    response = None
+    while response is None:
+        _, response = request.next_chunk()
+    return response
 
@@ -1,27 +1,30 @@
-import json
+import glob
 import random
-import re
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, lru_cache
 from pathlib import Path
 from random import randrange
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
+import orjson
 import yt_dlp
-from moviepy.editor import AudioFileClip, VideoFileClip
+from moviepy.editor import AudioFileClip
 from moviepy.video.io.ffmpeg_tools import ffmpeg_extract_subclip
 
 from utils import settings
 from utils.console import print_step, print_substep
 
 
+@cache
 def load_background_options():
     background_options = {}
     # Load background videos
-    with open("./utils/background_videos.json") as json_file:
-        background_options["video"] = json.load(json_file)
+    background_options["video"] = orjson.loads(Path("./utils/background_videos.json").read_bytes())
 
     # Load background audios
-    with open("./utils/background_audios.json") as json_file:
-        background_options["audio"] = json.load(json_file)
+    background_options["audio"] = orjson.loads(Path("./utils/background_audios.json").read_bytes())
 
     # Remove "__comment" from backgrounds
     del background_options["video"]["__comment"]
@@ -31,7 +34,8 @@ def load_background_options():
         pos = background_options["video"][name][3]
 
         if pos != "center":
-            background_options["video"][name][3] = lambda t: ("center", pos + t)
+            # bind pos now, otherwise every lambda would see the last background's position
+            background_options["video"][name][3] = lambda t, pos=pos: ("center", pos + t)
 
     return background_options
 
@@ -57,6 +61,39 @@ def get_start_and_end_times(video_length: int, length_of_clip: int) -> Tuple[int
     return random_time, random_time + video_length
 
 
+def get_duration(path: str) -> float:
+    """Reads the duration of a media file with ffprobe, without opening a decoder.
+
+    Args:
+        path (str): Path to the audio or video file
+
+    Returns:
+        float: Duration of the file in seconds
+    """
+    stat = Path(path).stat()
+    return _probe_duration(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=32)
+def _probe_duration(path: str, mtime_ns: int, size: int) -> float:
+    # mtime_ns and size are only part of the cache key, so a replaced file gets probed again
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "json",
+            path,
+        ],
+        capture_output=True,
+        check=True,
+    )
+    return float(orjson.loads(result.stdout)["format"]["duration"])
+
+
 def get_background_config(mode: str):
     """Fetch the background/s configuration"""
     try:
@@ -65,20 +102,43 @@ def get_background_config(mode: str):
         print_substep("No background selected. Picking random background'")
         choice = None
 
+    background_config = _get_configured_background(mode, choice)
+    if background_config is not None:
+        return background_config
+
     # Handle default / not supported background using default option.
     # Default : pick random from supported background.
-    if not choice or choice not in background_options[mode]:
-        choice = random.choice(list(background_options[mode].keys()))
+    # Not cached, so every video still gets a fresh random pick.
+    return background_options[mode][random.choice(list(background_options[mode].keys()))]
 
-    return background_options[mode][choice]
+
+@lru_cache(maxsize=8)
+def _get_configured_background(mode: str, choice: Optional[str]):
+    """Resolves a configured background choice, or None if it isn't supported"""
+    if not choice:
+        return None
+    return background_options[mode].get(choice)
+
+
+def _background_path(mode: str, background_config: Tuple) -> Path:
+    """Where the downloaded background of the given mode ("video" or "audio") is stored"""
+    # note: make sure the file name doesn't include an - in it
+    _, filename, credit = background_config[:3]
+    return Path(f"assets/backgrounds/{mode}/{credit}-{filename}")
+
+
+def download_backgrounds(background_config: Dict[str, Tuple]):
+    """Downloads the missing background video and audio."""
+    download_background_video(background_config["video"])
+    download_background_audio(background_config["audio"])
 
 
 def download_background_video(background_config: Tuple[str, str, str, Any]):
     """Downloads the background/s video from YouTube."""
     Path("./assets/backgrounds/video/").mkdir(parents=True, exist_ok=True)
-    # note: make sure the file name doesn't include an - in it
-    uri, filename, credit, _ = background_config
-    if Path(f"assets/backgrounds/video/{credit}-{filename}").is_file():
+    uri, filename, _, _ = background_config
+    output_path = _background_path("video", background_config)
+    if output_path.is_file():
         return
     print_step(
         "We need to download the backgrounds videos. they are fairly large but it's only done once. 😎"
@@ -87,21 +147,26 @@ def download_background_video(background_config: Tuple[str, str, str, Any]):
     print_substep(f"Downloading {filename} from {uri}")
     ydl_opts = {
         "format": "bestvideo[height<=1080][ext=mp4]",
-        "outtmpl": f"assets/backgrounds/video/{credit}-{filename}",
+        "outtmpl": str(output_path),
         "retries": 10,
     }
+    if shutil.which("aria2c"):
+        # the videos are large, so fetch them over several connections when aria2c is available
+        ydl_opts["external_downloader"] = "aria2c"
+        ydl_opts["external_downloader_args"] = ["-x", "16", "-s", "16", "-k", "1M"]
 
+    # YoutubeDL compiles its format selector when it's created, so every download gets its own
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        ydl.download(uri)
+        ydl.download([uri])
     print_substep("Background video downloaded successfully! 🎉", style="bold green")
 
 
 def download_background_audio(background_config: Tuple[str, str, str]):
     """Downloads the background/s audio from YouTube."""
     Path("./assets/backgrounds/audio/").mkdir(parents=True, exist_ok=True)
-    # note: make sure the file name doesn't include an - in it
-    uri, filename, credit = background_config
-    if Path(f"assets/backgrounds/audio/{credit}-{filename}").is_file():
+    uri, filename, _ = background_config
+    output_path = _background_path("audio", background_config)
+    if output_path.is_file():
         return
     print_step(
         "We need to download the backgrounds audio. they are fairly large but it's only done once. 😎"
@@ -109,7 +174,7 @@ def download_background_audio(background_config: Tuple[str, str, str]):
     print_substep("Downloading the backgrounds audio... please be patient 🙏 ")
     print_substep(f"Downloading {filename} from {uri}")
     ydl_opts = {
-        "outtmpl": f"./assets/backgrounds/audio/{credit}-{filename}",
+        "outtmpl": str(output_path),
         "format": "bestaudio/best",
         "extract_audio": True,
     }
@@ -120,32 +185,40 @@ def download_background_audio(background_config: Tuple[str, str, str]):
     print_substep("Background audio downloaded successfully! 🎉", style="bold green")
 
 
-def chop_background(background_config: Dict[str, Tuple], video_length: int, reddit_object: dict):
-    """Generates the background audio and footage to be used in the video and writes it to assets/temp/background.mp3 and assets/temp/background.mp4
+def find_background_audio(audio_choice: str) -> str:
+    """Finds the downloaded background audio, whatever extension it was saved with.
 
     Args:
-        background_config (Dict[str,Tuple]]) : Current background configuration
-        video_length (int): Length of the clip where the background footage is to be taken out of
+        audio_choice (str): The "{credit}-{filename}" name of the background audio
+
+    Returns:
+        str: Path to the background audio file
     """
-    id = re.sub(r"[^\w\s-]", "", reddit_object["thread_id"])
-
-    if settings.config["settings"]["background"][f"background_audio_volume"] == 0:
-        print_step("Volume was set to 0. Skipping background audio creation . . .")
-    else:
-        print_step("Finding a spot in the backgrounds audio to chop...✂️")
-        audio_choice = f"{background_config['audio'][2]}-{background_config['audio'][1]}"
-        background_audio = AudioFileClip(f"assets/backgrounds/audio/{audio_choice}")
+    audio_path = Path(f"assets/backgrounds/audio/{audio_choice}")
+    if audio_path.is_file():
+        return str(audio_path)
+    # a single directory scan instead of probing every known audio extension
+    return str(next(audio_path.parent.glob(f"{glob.escape(audio_path.stem)}.*"), audio_path))
+
+
+def chop_background_audio(audio_config: Tuple[str, str, str], video_length: int, id: str):
+    """Cuts a random part of the background audio to assets/temp/{id}/background.mp3"""
+    print_step("Finding a spot in the backgrounds audio to chop...✂️")
+    audio_choice = f"{audio_config[2]}-{audio_config[1]}"
+    with AudioFileClip(find_background_audio(audio_choice)) as background_audio:
         start_time_audio, end_time_audio = get_start_and_end_times(
             video_length, background_audio.duration
         )
         background_audio = background_audio.subclip(start_time_audio, end_time_audio)
         background_audio.write_audiofile(f"assets/temp/{id}/background.mp3")
 
+
+def chop_background_video(video_config: Tuple[str, str, str, Any], video_length: int, id: str):
+    """Cuts a random part of the background video to assets/temp/{id}/background.mp4"""
     print_step("Finding a spot in the backgrounds video to chop...✂️")
-    video_choice = f"{background_config['video'][2]}-{background_config['video'][1]}"
-    background_video = VideoFileClip(f"assets/backgrounds/video/{video_choice}")
+    video_choice = f"{video_config[2]}-{video_config[1]}"
     start_time_video, end_time_video = get_start_and_end_times(
-        video_length, background_video.duration
+        video_length, get_duration(f"assets/backgrounds/video/{video_choice}")
     )
     # Extract video subclip
     try:
@@ -157,10 +230,52 @@ def chop_background(background_config: Dict[str, Tuple], video_length: int, redd
         )
     except (OSError, IOError):  # ffmpeg issue see #348
         print_substep("FFMPEG issue. Trying again...")
-        with VideoFileClip(f"assets/backgrounds/video/{video_choice}") as video:
-            new = video.subclip(start_time_video, end_time_video)
-            new.write_videofile(f"assets/temp/{id}/background.mp4")
+        # stream copy the cut instead of decoding and re-encoding it
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-y",
+                "-loglevel",
+                "error",
+                "-ss",
+                str(start_time_video),
+                "-to",
+                str(end_time_video),
+                "-i",
+                f"assets/backgrounds/video/{video_choice}",
+                "-c",
+                "copy",
+                "-avoid_negative_ts",
+                "1",
+                f"assets/temp/{id}/background.mp4",
+            ],
+            check=True,
+        )
     print_substep("Background video chopped successfully!", style="bold green")
+
+
+def chop_background(background_config: Dict[str, Tuple], video_length: int, reddit_object: dict):
+    """Generates the background audio and footage to be used in the video and writes it to assets/temp/background.mp3 and assets/temp/background.mp4
+
+    Args:
+        background_config (Dict[str,Tuple]]) : Current background configuration
+        video_length (int): Length of the clip where the background footage is to be taken out of
+    """
+    id = reddit_object["safe_thread_id"]
+
+    # Both cuts are independent ffmpeg jobs, so run them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(chop_background_video, background_config["video"], video_length, id)
+        ]
+        if settings.config["settings"]["background"][f"background_audio_volume"] == 0:
+            print_step("Volume was set to 0. Skipping background audio creation . . .")
+        else:
+            futures.append(
+                executor.submit(chop_background_audio, background_config["audio"], video_length, id)
+            )
+        for future in futures:
+            future.result()
     return background_config["video"][2]
 
 
@@ -1,105 +1,321 @@
 import multiprocessing
 import os
 import re
-import tempfile
+import subprocess
 import textwrap
 import threading
-import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from functools import cache
 from os.path import exists  # Needs to be imported specifically
 from pathlib import Path
-from typing import Dict, Final, Tuple
+from typing import Any, Dict, Final, Iterable, Iterator, List, Optional, Tuple
 
 import ffmpeg
 import translators
-from PIL import Image, ImageDraw, ImageFont
+from mutagen import MutagenError
+from mutagen.mp3 import MP3
+from PIL import Image, ImageDraw
 from rich.console import Console
-from rich.progress import track
 
 from utils import settings
 from utils.cleanup import cleanup
 from utils.console import print_step, print_substep
-from utils.fonts import getheight
+from utils.fonts import getheight, load_font
 from utils.thumbnail import create_thumbnail
 from utils.videos import save_data
+from video_creation.background import get_duration
 
 console = Console()
 
 
-class ProgressFfmpeg(threading.Thread):
-    def __init__(self, vid_duration_seconds, progress_update_callback):
-        threading.Thread.__init__(self, name="ProgressFfmpeg")
-        self.stop_event = threading.Event()
-        self.output_file = tempfile.NamedTemporaryFile(mode="w+", delete=False)
-        self.vid_duration_seconds = vid_duration_seconds
-        self.progress_update_callback = progress_update_callback
-
-    def run(self):
-        while not self.stop_event.is_set():
-            latest_progress = self.get_latest_ms_progress()
-            if latest_progress is not None:
-                completed_percent = latest_progress / self.vid_duration_seconds
-                self.progress_update_callback(completed_percent)
-            time.sleep(1)
-
-    def get_latest_ms_progress(self):
-        lines = self.output_file.readlines()
-
-        if lines:
-            for line in lines:
-                if "out_time_ms" in line:
-                    out_time_ms_str = line.split("=")[1].strip()
-                    if out_time_ms_str.isnumeric():
-                        return float(out_time_ms_str) / 1000000.0
-                    else:
-                        # Handle the case when "N/A" is encountered
-                        return None
-        return None
+def parse_progress(line: str) -> Optional[float]:
+    """Seconds rendered so far from an out_time_us line, None for any other line"""
+    if line.startswith("out_time_us="):
+        out_time_us_str = line[12:].strip()
+        # ffmpeg reports "N/A" until the first frame is out
+        if out_time_us_str.isnumeric():
+            return int(out_time_us_str) / 1000000.0
+    return None
+
+
+def run_with_progress(
+    output, duration: float, progress_update_callback, input: Optional[Iterable[bytes]] = None
+):
+    """Runs an ffmpeg output and reports how much of duration it has rendered.
+
+    ffmpeg writes its -progress key=value lines to stdout, which is read line by line as they
+    come, so there is no file to poll or pipe to set up.
+
+    Args:
+        output: The ffmpeg-python output to run
+        duration (float): Length of the render in seconds
+        progress_update_callback: Called with the fraction of the render that is done
+        input (Iterable[bytes], optional): What the graph reads from stdin, written chunk by chunk
+
+    Raises:
+        ffmpeg.Error: ffmpeg failed, with its log in stderr
+    """
+    process = output.global_args("-progress", "pipe:1", "-nostats").run_async(
+        pipe_stdin=True, pipe_stdout=True, pipe_stderr=True
+    )
+
+    def feed_stdin():
+        try:
+            for chunk in input or ():
+                process.stdin.write(chunk)
+        except BrokenPipeError:  # ffmpeg failed, its exit code tells why
+            pass
+        finally:
+            process.stdin.close()
+
+    # stdin and stderr get their own threads, so ffmpeg never blocks on a full pipe while
+    # stdout is being read here
+    stderr = []
+    threads = [
+        threading.Thread(target=feed_stdin, daemon=True),
+        threading.Thread(target=lambda: stderr.append(process.stderr.read()), daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    for line in process.stdout:
+        latest_progress = parse_progress(line.decode("utf8", "replace"))
+        if latest_progress is not None:
+            progress_update_callback(latest_progress / duration)
+    for thread in threads:
+        thread.join()
+    if process.wait():
+        raise ffmpeg.Error("ffmpeg", None, stderr[0])
+
+
+# Most audio clips read, or probed by ffprobe, at once
+MAX_CONCURRENT_PROBES = 32
+
+
+def read_audio_clips(paths: List[str]) -> Tuple[List[float], List[Optional[Tuple[int, int]]]]:
+    """Reads the durations of the audio clips, in order, and the (sample rate, channels) of those
+    that are MP3s, from their MP3 headers.
+
+    Some TTS engines save other formats under a .mp3 name, those are probed with ffprobe instead
+    and have no MP3 format. Every clip is read once, from threads rather than an asyncio loop,
+    since the browser pool's Playwright keeps an event loop running on the main thread.
+    """
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_PROBES, len(paths))) as executor:
+        clips = list(executor.map(_read_audio_clip, paths))
+    return [duration for duration, _ in clips], [mp3_format for _, mp3_format in clips]
+
+
+def _read_audio_clip(path: str) -> Tuple[float, Optional[Tuple[int, int]]]:
+    try:
+        info = MP3(path).info
+    except MutagenError:
+        return get_duration(path), None
+    return info.length, (info.sample_rate, info.channels)
 
-    def stop(self):
-        self.stop_event.set()
 
-    def __enter__(self):
-        self.start()
-        return self
+def concat_audio_clips(
+    audio_paths: List[str], output_path: str, mp3_formats: List[Optional[Tuple[int, int]]]
+):
+    """Joins the audio clips in order into output_path.
 
-    def __exit__(self, *args, **kwargs):
-        self.stop()
+    Clips that are all MP3s with the same sample rate and channels are joined by the concat
+    demuxer, which copies the packets instead of decoding and re-encoding every clip.
+    Anything else goes through the concat filter.
+
+    Args:
+        mp3_formats (list): The (sample rate, channels) of each clip, from read_audio_clips
+    """
+    formats = set(mp3_formats)
+    if len(formats) == 1 and None not in formats:
+        concat_list = Path(output_path).with_name("audio_concat.txt")
+        concat_list.write_text(
+            "".join(
+                "file '{}'\n".format(str(Path(path).resolve()).replace("'", "'\\''"))
+                for path in audio_paths
+            )
+        )
+        try:
+            ffmpeg.input(str(concat_list), format="concat", safe=0).output(
+                output_path, c="copy"
+            ).overwrite_output().run(quiet=True)
+            return
+        except ffmpeg.Error:
+            print_substep("Couldn't join the audio clips directly, re-encoding them instead...")
+
+    audio_concat = ffmpeg.concat(*[ffmpeg.input(path) for path in audio_paths], a=1, v=0)
+    ffmpeg.output(audio_concat, output_path, **{"b:a": "192k"}).overwrite_output().run(quiet=True)
+
+
+# Characters that aren't allowed in file names on some platforms
+_FILENAME_UNSAFE = str.maketrans("", "", '?\\"%*:|<>')
+# Every way a slash is spelled out in a file name, tried in this order at each position
+_NAME_SLASHES = re.compile(
+    r"(?P<without> [wW]\s?/\s?[oO0])"
+    r"|(?P<with> [wW]\s?/)"
+    r"|(?P<of>(?P<numerator>\d+)\s?/\s?(?P<denominator>\d+))"
+    r"|(?P<or>(?P<first>\w+)\s?/\s?(?P<second>\w+))"
+    r"|/"
+)
+
+
+def _spell_out_slash(match: re.Match) -> str:
+    kind = match.lastgroup
+    if kind == "without":
+        return " without"
+    if kind == "with":
+        return " with"
+    if kind == "of":
+        return f"{match['numerator']} of {match['denominator']}"
+    if kind == "or":
+        return f"{match['first']} or {match['second']}"
+    return ""  # any other slash is dropped
+
+
+# Seconds to wait for a translation before giving up on it
+TRANSLATE_TIMEOUT = 5
+# Runs the translations, so a hanging request can be given up on without blocking the render
+_translate_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="translate")
 
 
 def name_normalize(name: str) -> str:
-    name = re.sub(r'[?\\"%*:|<>]', "", name)
-    name = re.sub(r"( [w,W]\s?\/\s?[o,O,0])", r" without", name)
-    name = re.sub(r"( [w,W]\s?\/)", r" with", name)
-    name = re.sub(r"(\d+)\s?\/\s?(\d+)", r"\1 of \2", name)
-    name = re.sub(r"(\w+)\s?\/\s?(\w+)", r"\1 or \2", name)
-    name = re.sub(r"\/", r"", name)
+    name = _NAME_SLASHES.sub(_spell_out_slash, name.translate(_FILENAME_UNSAFE))
 
     lang = settings.config["reddit"]["thread"]["post_lang"]
     if lang:
         print_substep("Translating filename...")
-        translated_name = translators.translate_text(name, translator="google", to_language=lang)
-        return translated_name
+        translation = _translate_executor.submit(
+            translators.translate_text, name, translator="google", to_language=lang
+        )
+        try:
+            return translation.result(timeout=TRANSLATE_TIMEOUT)
+        except TimeoutError:
+            print_substep(
+                f"Translating took longer than {TRANSLATE_TIMEOUT} seconds, keeping the original name.",
+                style="bold red",
+            )
+            return name
     else:
         return name
 
 
+# Hardware h264 encoders that take the software frames of the render graph as they are
+HARDWARE_H264_ENCODERS = ("h264_nvenc", "h264_qsv")
+
+
+@cache
+def hardware_h264_encoder() -> Optional[str]:
+    """The first hardware h264 encoder that works on this machine, None if there is none"""
+    try:
+        encoders = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"], capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    for encoder in HARDWARE_H264_ENCODERS:
+        if encoder not in encoders:
+            continue
+        # being listed only means ffmpeg was built with it, make sure there's a device behind it
+        test_encode = subprocess.run(
+            [
+                "ffmpeg",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-f",
+                "lavfi",
+                "-i",
+                "color=size=256x256:duration=0.1",
+                "-c:v",
+                encoder,
+                "-f",
+                "null",
+                "-",
+            ],
+            capture_output=True,
+        )
+        if test_encode.returncode == 0:
+            return encoder
+    return None
+
+
+def h264_options() -> Dict[str, Any]:
+    """ffmpeg output options for the h264 encodes.
+
+    Uses a hardware encoder when one is available and settings.hardware_encoding allows it,
+    otherwise libx264 with the configured preset and CRF.
+    """
+    crf = settings.config["settings"].get("video_crf", 23)
+    encoder = (
+        hardware_h264_encoder()
+        if settings.config["settings"].get("hardware_encoding", True)
+        else None
+    )
+    if encoder == "h264_nvenc":
+        return {
+            "c:v": encoder,
+            "preset": "p4",
+            "rc": "vbr",
+            "cq": crf,
+            "b:v": 0,
+            "profile:v": "high",
+            "pix_fmt": "yuv420p",
+        }
+    if encoder == "h264_qsv":
+        return {"c:v": encoder, "preset": "veryfast", "global_quality": crf}
+    return {
+        "c:v": "libx264",
+        "preset": settings.config["settings"].get("video_preset", "veryfast"),
+        "crf": crf,
+        "pix_fmt": "yuv420p",
+        # let x264 pick its own frame threads, forcing one per core oversubscribes big machines
+        "threads": 0,
+    }
+
+
+def decoder_options() -> Dict[str, Any]:
+    """ffmpeg input options for the background video, decoding it on the GPU when it's also
+    encoded there. The frames are copied back to memory, since the filters run on the CPU.
+    """
+    if (
+        settings.config["settings"].get("hardware_encoding", True)
+        and hardware_h264_encoder() == "h264_nvenc"
+    ):
+        return {"hwaccel": "cuda"}
+    return {}
+
+
+# Threads for the filter graph (crop, overlays, drawtext), which has its own thread pool
+FILTER_THREADS = min(8, multiprocessing.cpu_count())
+
+
 def prepare_background(reddit_id: str, W: int, H: int) -> str:
+    """Crops the chopped background to W:H into a separate file without audio.
+
+    make_final_video crops in its own render graph instead, this is kept for callers that want
+    the cropped background on disk.
+    """
+    input_path = f"assets/temp/{reddit_id}/background.mp4"
     output_path = f"assets/temp/{reddit_id}/background_noaudio.mp4"
-    output = (
-        ffmpeg.input(f"assets/temp/{reddit_id}/background.mp4")
-        .filter("crop", f"ih*({W}/{H})", "ih")
-        .output(
-            output_path,
-            an=None,
-            **{
-                "c:v": "h264",
-                "b:v": "20M",
-                "b:a": "192k",
-                "threads": multiprocessing.cpu_count(),
-            },
-        )
-        .overwrite_output()
+
+    video_stream = next(
+        stream for stream in ffmpeg.probe(input_path)["streams"] if stream["codec_type"] == "video"
     )
+    if abs(int(video_stream["width"]) / int(video_stream["height"]) - W / H) < 1e-3:
+        # The crop wouldn't cut anything, so just drop the audio without re-encoding the video
+        output = (
+            ffmpeg.input(input_path).output(output_path, an=None, vcodec="copy").overwrite_output()
+        )
+    else:
+        output = (
+            ffmpeg.input(input_path, **decoder_options())
+            .filter("crop", f"ih*({W}/{H})", "ih")
+            .output(
+                output_path,
+                an=None,
+                **h264_options(),
+            )
+            .overwrite_output()
+            .global_args("-filter_complex_threads", str(FILTER_THREADS))
+        )
     try:
         output.run(quiet=True)
     except ffmpeg.Error as e:
@@ -108,12 +324,54 @@ def prepare_background(reddit_id: str, W: int, H: int) -> str:
     return output_path
 
 
-def create_fancy_thumbnail(image, text, text_color, padding, wrap=35):
+@cache
+def _load_title_template() -> Image.Image:
+    # already in the RGBA layout the title card is piped to ffmpeg in
+    with Image.open("assets/title_template.png") as template:
+        return template.convert("RGBA")
+
+
+def load_title_template() -> Image.Image:
+    """The title template image, read from disk once. Returns a copy that is safe to draw on"""
+    return _load_title_template().copy()
+
+
+TITLE_FONT = os.path.join("fonts", "Roboto-Bold.ttf")
+TITLE_MIN_FONT_SIZE = 30
+TITLE_MAX_FONT_SIZE = 47
+TITLE_MAX_LINES = 4
+
+
+def _wrap_title(text: str, font, max_text_width: int) -> List[str]:
+    """Wraps the title on the average character width of font, close to max_text_width wide"""
+    chars_per_line = max(1, int(max_text_width * len(text) / max(font.getlength(text), 1)))
+    return textwrap.wrap(text, width=chars_per_line)
+
+
+def _title_fits(lines: List[str], font, max_text_width: int) -> bool:
+    return (
+        len(lines) <= TITLE_MAX_LINES
+        and max(map(font.getlength, lines), default=0) <= max_text_width
+    )
+
+
+def create_fancy_thumbnail(image, text, text_color, padding):
     print_step(f"Creating fancy thumbnail for: {text}")
-    font_title_size = 47
-    font = ImageFont.truetype(os.path.join("fonts", "Roboto-Bold.ttf"), font_title_size)
     image_width, image_height = image.size
-    lines = textwrap.wrap(text, width=wrap)
+    max_text_width = image_width - 240
+
+    # binary search for the largest font size whose wrapped title fits the template, titles
+    # too long even for the smallest size overflow the bottom like they always did
+    low, high = TITLE_MIN_FONT_SIZE, TITLE_MAX_FONT_SIZE
+    while low < high:
+        middle = (low + high + 1) // 2
+        font = load_font(TITLE_FONT, middle)
+        if _title_fits(_wrap_title(text, font, max_text_width), font, max_text_width):
+            low = middle
+        else:
+            high = middle - 1
+    font = load_font(TITLE_FONT, low)
+    lines = _wrap_title(text, font, max_text_width)
     y = (
         (image_height / 2)
         - (((getheight(font, text) + (len(lines) * padding) / len(lines)) * len(lines)) / 2)
@@ -121,7 +379,7 @@ def create_fancy_thumbnail(image, text, text_color, padding, wrap=35):
     )
     draw = ImageDraw.Draw(image)
 
-    username_font = ImageFont.truetype(os.path.join("fonts", "Roboto-Bold.ttf"), 30)
+    username_font = load_font(TITLE_FONT, 30)
     draw.text(
         (205, 825),
         settings.config["settings"]["channel_name"],
@@ -130,34 +388,6 @@ def create_fancy_thumbnail(image, text, text_color, padding, wrap=35):
         align="left",
     )
 
-    if len(lines) == 3:
-        lines = textwrap.wrap(text, width=wrap + 10)
-        font_title_size = 40
-        font = ImageFont.truetype(os.path.join("fonts", "Roboto-Bold.ttf"), font_title_size)
-        y = (
-            (image_height / 2)
-            - (((getheight(font, text) + (len(lines) * padding) / len(lines)) * len(lines)) / 2)
-            + 35
-        )
-    elif len(lines) == 4:
-        lines = textwrap.wrap(text, width=wrap + 10)
-        font_title_size = 35
-        font = ImageFont.truetype(os.path.join("fonts", "Roboto-Bold.ttf"), font_title_size)
-        y = (
-            (image_height / 2)
-            - (((getheight(font, text) + (len(lines) * padding) / len(lines)) * len(lines)) / 2)
-            + 40
-        )
-    elif len(lines) > 4:
-        lines = textwrap.wrap(text, width=wrap + 10)
-        font_title_size = 30
-        font = ImageFont.truetype(os.path.join("fonts", "Roboto-Bold.ttf"), font_title_size)
-        y = (
-            (image_height / 2)
-            - (((getheight(font, text) + (len(lines) * padding) / len(lines)) * len(lines)) / 2)
-            + 30
-        )
-
     for line in lines:
         draw.text((120, y), line, font=font, fill=text_color, align="left")
         y += getheight(font, line) + padding
@@ -165,6 +395,144 @@ def create_fancy_thumbnail(image, text, text_color, padding, wrap=35):
     return image
 
 
+def draw_title(background_clip, title: str, duration: float, font_size: int):
+    """Draws the title over the first seconds of the video with ffmpeg's drawtext filter.
+
+    Used instead of the title template image when settings.title_drawtext is on.
+    """
+    return ffmpeg.drawtext(
+        background_clip,
+        text="\n".join(textwrap.wrap(title, width=35)),
+        fontfile=TITLE_FONT,
+        fontsize=font_size,
+        fontcolor="White",
+        x="(w-text_w)/2",
+        y="(h-text_h)/2",
+        box=1,
+        boxcolor="black@0.5",
+        boxborderw=font_size // 2,
+        expansion="none",
+        enable=f"between(t,0,{duration})",
+    )
+
+
+def create_credit_image(text: str, path: str, font_size: int = 5):
+    """Renders the background credit once to a transparent PNG at path, so it's overlaid on the
+    video instead of rasterized again by drawtext for every frame.
+    """
+    font = load_font(os.path.join("fonts", "Roboto-Regular.ttf"), font_size)
+    left, top, right, bottom = font.getbbox(text)
+    image = Image.new("RGBA", (max(right - left, 1), max(bottom - top, 1)), (0, 0, 0, 0))
+    ImageDraw.Draw(image).text((-left, -top), text, font=font, fill="White")
+    image.save(path)
+
+
+OVERLAY_FRAME_RATE = 25
+
+
+def load_resized(path: str, width: int) -> Image.Image:
+    """Opens the image at path in RGBA, scaled to width keeping its aspect ratio"""
+    with Image.open(path) as image:
+        image = image.convert("RGBA")
+    if image.width == width:
+        return image
+    return image.resize(
+        (width, round(image.height * width / image.width)), Image.Resampling.BILINEAR
+    )
+
+
+def load_images(paths: List[str], width: int) -> List[Image.Image]:
+    """Opens and scales the images to width, side by side.
+
+    ffmpeg doesn't have to scale them in the render graph. Pillow releases the GIL while
+    decoding and resizing, so threads are enough.
+    """
+    with ThreadPoolExecutor() as executor:
+        return list(executor.map(load_resized, paths, [width] * len(paths)))
+
+
+class OverlayFrames:
+    """The raw RGBA frames of overlay_in_sequence, one per image and a transparent one to end the
+    last image.
+
+    They are drawn one at a time whenever they are iterated, so every ffmpeg process they are
+    piped to only holds a single canvas sized frame in memory.
+    """
+
+    def __init__(self, images: List[Image.Image]):
+        self.images = images
+        self.size = (max(image.width for image in images), max(image.height for image in images))
+
+    def __iter__(self) -> Iterator[bytes]:
+        for image in self.images:
+            # the frames of a stream all have the same size, centering on a transparent canvas
+            # keeps each image where its own overlay used to put it
+            canvas = Image.new("RGBA", self.size, (0, 0, 0, 0))
+            canvas.paste(
+                image, ((self.size[0] - image.width) // 2, (self.size[1] - image.height) // 2)
+            )
+            yield canvas.tobytes()
+        # a transparent frame ends the last image
+        yield Image.new("RGBA", self.size, (0, 0, 0, 0)).tobytes()
+
+
+def overlay_in_sequence(
+    background_clip,
+    images: List[Image.Image],
+    durations: List[float],
+    start_time: float,
+    opacity: Optional[float] = None,
+):
+    """Overlays the images one after another at the center of the background, each one for its
+    duration, starting at start_time.
+
+    The images are piped to ffmpeg as raw RGBA frames of a single stream, one frame per image,
+    so nothing is compressed to PNG and decoded again. Each frame is timestamped at the start of
+    its image and the fps filter repeats it until the next one, so the render graph has a single
+    overlay.
+
+    Args:
+        images (List[Image.Image]): The images in RGBA
+        durations (List[float]): How long each image is shown, in seconds
+        opacity (float, optional): Opacity of the images, fully opaque if not given
+
+    Returns:
+        The video stream, and the OverlayFrames that have to be written to ffmpeg's stdin
+    """
+    if not images:
+        return background_clip, None
+    frames = OverlayFrames(images)
+
+    starts = [start_time]
+    for duration in durations[: len(images)]:
+        starts.append(starts[-1] + duration)
+    timestamps = "+".join(f"eq(N,{index})*{start}" for index, start in enumerate(starts))
+
+    sequence = ffmpeg.input(
+        "pipe:",
+        format="rawvideo",
+        pix_fmt="rgba",
+        s=f"{frames.size[0]}x{frames.size[1]}",
+        framerate=OVERLAY_FRAME_RATE,
+    )["v"]
+    if opacity is not None:
+        sequence = sequence.filter("colorchannelmixer", aa=opacity)
+    # Everything up to here runs once per image. It's converted to the format overlay blends in
+    # before being repeated, so the repeats need no work per frame.
+    sequence = (
+        sequence.filter("format", "yuva420p")
+        .filter("setpts", f"({timestamps})/TB")
+        .filter("fps", OVERLAY_FRAME_RATE)
+    )
+    video = background_clip.overlay(
+        sequence,
+        x="(main_w-overlay_w)/2",
+        y="(main_h-overlay_h)/2",
+        eof_action="pass",
+    )
+    return video, frames
+
+
 def merge_background_audio(audio: ffmpeg, reddit_id: str):
     """Gather an audio and merge with assets/backgrounds/background.mp3
     Args:
@@ -185,6 +553,76 @@ def merge_background_audio(audio: ffmpeg, reddit_id: str):
         return merged_audio  # Return merged audio
 
 
+def render_in_segments(
+    video,
+    audio_outputs: list,
+    segment_count: int,
+    length: float,
+    reddit_id: str,
+    overlay_frames: Optional[OverlayFrames],
+    progress_update_callback,
+):
+    """Encodes the video as segment_count time slices in parallel ffmpeg processes, then joins
+    the slices with the concat demuxer and adds the audio, which is encoded only once per output.
+
+    Every process still decodes and filters the background up to the start of its slice, so this
+    only pays off on machines with more cores than a single x264 encode keeps busy.
+
+    Args:
+        video: The fully filtered video stream
+        audio_outputs (list): (audio stream, output path) of each video to write
+        overlay_frames (OverlayFrames, optional): What the video's graph reads from stdin
+    """
+    segment_dir = Path(f"assets/temp/{reddit_id}/segments").resolve()
+    segment_dir.mkdir(parents=True, exist_ok=True)
+    segment_paths = [str(segment_dir / f"segment_{index}.mp4") for index in range(segment_count)]
+    segment_length = length / segment_count
+    segment_options = {
+        "f": "mp4",
+        **h264_options(),
+        # the encoders share the machine
+        "threads": max(1, multiprocessing.cpu_count() // segment_count),
+    }
+    progress = [0.0] * segment_count
+
+    def render_segment(index: int):
+        def on_segment_update(segment_progress):
+            progress[index] = segment_progress
+            progress_update_callback(sum(progress) / segment_count)
+
+        # the last slice has no length, so it runs to whatever the video's real end is
+        timing = {"ss": index * segment_length}
+        if index < segment_count - 1:
+            timing["t"] = segment_length
+        run_with_progress(
+            ffmpeg.output(video, segment_paths[index], an=None, **timing, **segment_options)
+            .overwrite_output()
+            .global_args("-filter_complex_threads", str(FILTER_THREADS)),
+            segment_length,
+            on_segment_update,
+            overlay_frames,
+        )
+
+    with ThreadPoolExecutor(max_workers=segment_count) as executor:
+        list(executor.map(render_segment, range(segment_count)))
+
+    concat_list = segment_dir / "segments.txt"
+    concat_list.write_text("".join(f"file '{path}'\n" for path in segment_paths))
+    joined = ffmpeg.input(str(concat_list), format="concat", safe=0)["v"]
+    ffmpeg.merge_outputs(
+        *[
+            ffmpeg.output(
+                joined,
+                audio,
+                path,
+                f="mp4",
+                **{"c:v": "copy", "b:a": "192k", "movflags": "+faststart"},
+            )
+            for audio, path in audio_outputs
+        ]
+    ).overwrite_output().run(quiet=True)
+
+
 def make_final_video(
     number_of_clips: int,
     length: int,
@@ -204,7 +642,7 @@ def make_final_video(
 
     opacity = settings.config["settings"]["opacity"]
 
-    reddit_id = re.sub(r"[^\w\s-]", "", reddit_obj["thread_id"])
+    reddit_id = reddit_obj["safe_thread_id"]
 
     allowOnlyTTSFolder: bool = (
         settings.config["settings"]["background"]["enable_extra_audio"]
@@ -213,150 +651,127 @@ def make_final_video(
 
     print_step("Creating the final video 🎥")
 
-    background_clip = ffmpeg.input(prepare_background(reddit_id, W=W, H=H))
+    # The names may need translating over the network, so they're worked out alongside the audio
+    # and image work below. They get their own threads, as name_normalize waits on
+    # _translate_executor itself.
+    names_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="name_normalize")
+    title_future = names_executor.submit(name_normalize, reddit_obj["thread_title"])
+    filename_future = names_executor.submit(
+        name_normalize, re.sub(r"[^\w\s-]", "", reddit_obj["thread_title"])
+    )
+    names_executor.shutdown(wait=False)
+
+    # Crop inside the render graph rather than through prepare_background, so the background is
+    # only encoded once
+    background_path = f"assets/temp/{reddit_id}/background.mp4"
+    background_clip = ffmpeg.input(background_path, **decoder_options()).video.filter(
+        "crop", f"ih*({W}/{H})", "ih"
+    )
+    background_stream = next(
+        stream
+        for stream in ffmpeg.probe(background_path)["streams"]
+        if stream["codec_type"] == "video"
+    )
+    # the overlays used to be drawn on the unscaled crop and scaled up with it, so they are
+    # enlarged by the same factor to keep the video's layout
+    overlay_scale = H / int(background_stream["height"])
+    if overlay_scale != 1:
+        # scaled before anything is composited on it, so the overlays and texts are drawn at
+        # the final size and the finished frames don't need another scaling pass
+        background_clip = background_clip.filter("scale", W, H)
 
     # Gather all audio clips
-    audio_clips = list()
     if number_of_clips == 0 and not settings.config["settings"]["storymode"]:
         print(
             "No audio clips to gather. Please use a different TTS or post."
         )  # This is to fix the TypeError: unsupported operand type(s) for +: 'int' and 'NoneType'
         exit()
+    audio_paths = [f"assets/temp/{reddit_id}/mp3/title.mp3"]
     if settings.config["settings"]["storymode"]:
         if settings.config["settings"]["storymodemethod"] == 0:
-            audio_clips = [ffmpeg.input(f"assets/temp/{reddit_id}/mp3/title.mp3")]
-            audio_clips.insert(1, ffmpeg.input(f"assets/temp/{reddit_id}/mp3/postaudio.mp3"))
+            audio_paths.append(f"assets/temp/{reddit_id}/mp3/postaudio.mp3")
         elif settings.config["settings"]["storymodemethod"] == 1:
-            audio_clips = [
-                ffmpeg.input(f"assets/temp/{reddit_id}/mp3/postaudio-{i}.mp3")
-                for i in track(range(number_of_clips + 1), "Collecting the audio files...")
+            audio_paths += [
+                f"assets/temp/{reddit_id}/mp3/postaudio-{i}.mp3" for i in range(number_of_clips + 1)
             ]
-            audio_clips.insert(0, ffmpeg.input(f"assets/temp/{reddit_id}/mp3/title.mp3"))
-
     else:
-        audio_clips = [
-            ffmpeg.input(f"assets/temp/{reddit_id}/mp3/{i}.mp3") for i in range(number_of_clips)
-        ]
-        audio_clips.insert(0, ffmpeg.input(f"assets/temp/{reddit_id}/mp3/title.mp3"))
+        audio_paths += [f"assets/temp/{reddit_id}/mp3/{i}.mp3" for i in range(number_of_clips)]
 
-        audio_clips_durations = [
-            float(ffmpeg.probe(f"assets/temp/{reddit_id}/mp3/{i}.mp3")["format"]["duration"])
-            for i in range(number_of_clips)
-        ]
-        audio_clips_durations.insert(
-            0,
-            float(ffmpeg.probe(f"assets/temp/{reddit_id}/mp3/title.mp3")["format"]["duration"]),
-        )
-    audio_concat = ffmpeg.concat(*audio_clips, a=1, v=0)
-    ffmpeg.output(
-        audio_concat, f"assets/temp/{reddit_id}/audio.mp3", **{"b:a": "192k"}
-    ).overwrite_output().run(quiet=True)
+    audio_clips_durations, mp3_formats = read_audio_clips(audio_paths)
+    concat_audio_clips(audio_paths, f"assets/temp/{reddit_id}/audio.mp3", mp3_formats)
 
     console.log(f"[bold green] Video Will Be: {length} Seconds Long")
 
-    screenshot_width = int((W * 45) // 100)
+    screenshot_width = round(int((W * 45) // 100) * overlay_scale)
     audio = ffmpeg.input(f"assets/temp/{reddit_id}/audio.mp3")
     final_audio = merge_background_audio(audio, reddit_id)
 
-    image_clips = list()
-
-    Path(f"assets/temp/{reddit_id}/png").mkdir(parents=True, exist_ok=True)
+    images = list()  # the images to overlay, in order
 
     # Credits to tim (beingbored)
     # get the title_template image and draw a text in the middle part of it with the title of the thread
-    title_template = Image.open("assets/title_template.png")
-
-    title = reddit_obj["thread_title"]
+    title_template = load_title_template()
 
-    title = name_normalize(title)
+    title = title_future.result()
 
     font_color = "#000000"
     padding = 5
 
-    # create_fancy_thumbnail(image, text, text_color, padding
-    title_img = create_fancy_thumbnail(title_template, title, font_color, padding)
-
-    title_img.save(f"assets/temp/{reddit_id}/png/title.png")
-    image_clips.insert(
-        0,
-        ffmpeg.input(f"assets/temp/{reddit_id}/png/title.png")["v"].filter(
-            "scale", screenshot_width, -1
-        ),
-    )
+    if settings.config["settings"].get("title_drawtext", False):
+        # drawn straight into the render graph, so there is no title image to overlay
+        background_clip = draw_title(
+            background_clip,
+            title,
+            audio_clips_durations[0],
+            round(TITLE_MAX_FONT_SIZE * screenshot_width / title_template.width),
+        )
+        images.insert(0, None)
+    else:
+        # create_fancy_thumbnail(image, text, text_color, padding
+        title_img = create_fancy_thumbnail(title_template, title, font_color, padding)
+        title_img = title_img.resize(
+            (screenshot_width, round(title_img.height * screenshot_width / title_img.width)),
+            Image.Resampling.BILINEAR,
+        )
+        images.insert(0, title_img if title_img.mode == "RGBA" else title_img.convert("RGBA"))
 
-    current_time = 0
     if settings.config["settings"]["storymode"]:
-        audio_clips_durations = [
-            float(
-                ffmpeg.probe(f"assets/temp/{reddit_id}/mp3/postaudio-{i}.mp3")["format"]["duration"]
-            )
-            for i in range(number_of_clips)
-        ]
-        audio_clips_durations.insert(
-            0,
-            float(ffmpeg.probe(f"assets/temp/{reddit_id}/mp3/title.mp3")["format"]["duration"]),
-        )
-        if settings.config["settings"]["storymodemethod"] == 0:
-            image_clips.insert(
-                1,
-                ffmpeg.input(f"assets/temp/{reddit_id}/png/story_content.png").filter(
-                    "scale", screenshot_width, -1
-                ),
+        if settings.config["settings"]["storymodemethod"] == 1:
+            images += load_images(
+                [f"assets/temp/{reddit_id}/png/img{i}.png" for i in range(number_of_clips)],
+                screenshot_width,
             )
-            background_clip = background_clip.overlay(
-                image_clips[0],
-                enable=f"between(t,{current_time},{current_time + audio_clips_durations[0]})",
-                x="(main_w-overlay_w)/2",
-                y="(main_h-overlay_h)/2",
-            )
-            current_time += audio_clips_durations[0]
-        elif settings.config["settings"]["storymodemethod"] == 1:
-            for i in track(range(0, number_of_clips + 1), "Collecting the image files..."):
-                image_clips.append(
-                    ffmpeg.input(f"assets/temp/{reddit_id}/png/img{i}.png")["v"].filter(
-                        "scale", screenshot_width, -1
-                    )
-                )
-                background_clip = background_clip.overlay(
-                    image_clips[i],
-                    enable=f"between(t,{current_time},{current_time + audio_clips_durations[i]})",
-                    x="(main_w-overlay_w)/2",
-                    y="(main_h-overlay_h)/2",
-                )
-                current_time += audio_clips_durations[i]
     else:
-        for i in range(0, number_of_clips + 1):
-            image_clips.append(
-                ffmpeg.input(f"assets/temp/{reddit_id}/png/comment_{i}.png")["v"].filter(
-                    "scale", screenshot_width, -1
-                )
-            )
-            image_overlay = image_clips[i].filter("colorchannelmixer", aa=opacity)
-            assert (
-                audio_clips_durations is not None
-            ), "Please make a GitHub issue if you see this. Ping @JasonLovesDoggo on GitHub."
-            background_clip = background_clip.overlay(
-                image_overlay,
-                enable=f"between(t,{current_time},{current_time + audio_clips_durations[i]})",
-                x="(main_w-overlay_w)/2",
-                y="(main_h-overlay_h)/2",
-            )
-            current_time += audio_clips_durations[i]
+        images += load_images(
+            [f"assets/temp/{reddit_id}/png/comment_{i}.png" for i in range(number_of_clips)],
+            screenshot_width,
+        )
+
+    # with title_drawtext the title is already drawn, so the images start after it
+    first_clip = 1 if images[0] is None else 0
+    background_clip, overlay_frames = overlay_in_sequence(
+        background_clip,
+        images[first_clip:],
+        audio_clips_durations[first_clip:],
+        start_time=sum(audio_clips_durations[:first_clip]),
+        opacity=None if settings.config["settings"]["storymode"] else opacity,
+    )
 
     title = re.sub(r"[^\w\s-]", "", reddit_obj["thread_title"])
-    idx = re.sub(r"[^\w\s-]", "", reddit_obj["thread_id"])
+    idx = reddit_obj["safe_thread_id"]
+    citation = background_config["video"][2]
     title_thumb = reddit_obj["thread_title"]
 
-    filename = f"{name_normalize(title)[:251]}"
+    filename = f"{filename_future.result()[:251]}"
     subreddit = settings.config["reddit"]["thread"]["subreddit"]
 
     if not exists(f"./results/{subreddit}"):
         print_substep("The 'results' folder could not be found so it was automatically created.")
-        os.makedirs(f"./results/{subreddit}")
+        os.makedirs(f"./results/{subreddit}", exist_ok=True)
 
     if not exists(f"./results/{subreddit}/OnlyTTS") and allowOnlyTTSFolder:
         print_substep("The 'OnlyTTS' folder could not be found so it was automatically created.")
-        os.makedirs(f"./results/{subreddit}/OnlyTTS")
+        os.makedirs(f"./results/{subreddit}/OnlyTTS", exist_ok=True)
 
     # create a thumbnail for the video
     settingsbackground = settings.config["settings"]["background"]
@@ -366,7 +781,7 @@ def make_final_video(
             print_substep(
                 "The 'results/thumbnails' folder could not be found so it was automatically created."
             )
-            os.makedirs(f"./results/{subreddit}/thumbnails")
+            os.makedirs(f"./results/{subreddit}/thumbnails", exist_ok=True)
         # get the first file with the .png extension from assets/backgrounds and use it as a background for the thumbnail
         first_image = next(
             (file for file in os.listdir("assets/backgrounds") if file.endswith(".png")),
@@ -393,17 +808,11 @@ def make_final_video(
             thumbnailSave.save(f"./assets/temp/{reddit_id}/thumbnail.png")
             print_substep(f"Thumbnail - Building Thumbnail in assets/temp/{reddit_id}/thumbnail.png")
 
-    text = f"Background by {background_config['video'][2]}"
-    background_clip = ffmpeg.drawtext(
-        background_clip,
-        text=text,
-        x=f"(w-text_w)",
-        y=f"(h-text_h)",
-        fontsize=5,
-        fontcolor="White",
-        fontfile=os.path.join("fonts", "Roboto-Regular.ttf"),
-    )
-    background_clip = background_clip.filter("scale", W, H)
+    text = f"Background by {citation}"
+    credit_path = f"assets/temp/{reddit_id}/credit.png"
+    create_credit_image(text, credit_path, font_size=max(1, round(5 * overlay_scale)))
+    # a single still frame, which overlay keeps showing until the end of the video
+    background_clip = background_clip.overlay(ffmpeg.input(credit_path), x="W-w", y="H-h")
     print_step("Rendering the video 🎥")
     from tqdm import tqdm
 
@@ -414,68 +823,64 @@ def make_final_video(
         old_percentage = pbar.n
         pbar.update(status - old_percentage)
 
+    segment_count = settings.config["settings"].get("render_segments", 1)
     defaultPath = f"results/{subreddit}"
-    with ProgressFfmpeg(length, on_update_example) as progress:
-        path = defaultPath + f"/{filename}"
-        path = (
-            path[:251] + ".mp4"
+    path = defaultPath + f"/{filename}"
+    path = path[:251] + ".mp4"  # Prevent a error by limiting the path length, do not change this.
+    output_options = {
+        "f": "mp4",
+        **h264_options(),
+        "b:a": "192k",
+        # index up front, so the video can start playing before it's fully loaded
+        "movflags": "+faststart",
+    }
+    if allowOnlyTTSFolder:
+        only_tts_path = defaultPath + f"/OnlyTTS/{filename}"
+        only_tts_path = (
+            only_tts_path[:251] + ".mp4"
         )  # Prevent a error by limiting the path length, do not change this.
-        try:
-            ffmpeg.output(
+
+    render = (
+        ffmpeg.output(background_clip, final_audio, path, **output_options)
+        .overwrite_output()
+        .global_args("-filter_complex_threads", str(FILTER_THREADS))
+    )
+    try:
+        if segment_count > 1 and output_options["c:v"] == "libx264":
+            audio_outputs = [(final_audio, path)]
+            if allowOnlyTTSFolder:
+                audio_outputs.append(
+                    (ffmpeg.input(f"assets/temp/{reddit_id}/audio.mp3"), only_tts_path)
+                )
+            render_in_segments(
                 background_clip,
-                final_audio,
-                path,
-                f="mp4",
-                **{
-                    "c:v": "h264",
-                    "b:v": "20M",
-                    "b:a": "192k",
-                    "threads": multiprocessing.cpu_count(),
-                },
-            ).overwrite_output().global_args("-progress", progress.output_file.name).run(
-                quiet=True,
-                overwrite_output=True,
-                capture_stdout=False,
-                capture_stderr=False,
+                audio_outputs,
+                segment_count,
+                length,
+                reddit_id,
+                overlay_frames,
+                on_update_example,
             )
-        except ffmpeg.Error as e:
-            print(e.stderr.decode("utf8"))
-            exit(1)
-    old_percentage = pbar.n
-    pbar.update(100 - old_percentage)
-    if allowOnlyTTSFolder:
-        path = defaultPath + f"/OnlyTTS/{filename}"
-        path = (
-            path[:251] + ".mp4"
-        )  # Prevent a error by limiting the path length, do not change this.
-        print_step("Rendering the Only TTS Video 🎥")
-        with ProgressFfmpeg(length, on_update_example) as progress:
-            try:
+        else:
+            run_with_progress(render, length, on_update_example, overlay_frames)
+            if allowOnlyTTSFolder:
+                # The Only TTS video has the very same picture, so it's only remuxed with
+                # the TTS audio instead of encoded again
+                print_substep("Creating the Only TTS Video 🎥")
                 ffmpeg.output(
-                    background_clip,
-                    audio,
-                    path,
+                    ffmpeg.input(path)["v"],
+                    ffmpeg.input(f"assets/temp/{reddit_id}/audio.mp3")["a"],
+                    only_tts_path,
                     f="mp4",
-                    **{
-                        "c:v": "h264",
-                        "b:v": "20M",
-                        "b:a": "192k",
-                        "threads": multiprocessing.cpu_count(),
-                    },
-                ).overwrite_output().global_args("-progress", progress.output_file.name).run(
-                    quiet=True,
-                    overwrite_output=True,
-                    capture_stdout=False,
-                    capture_stderr=False,
-                )
-            except ffmpeg.Error as e:
-                print(e.stderr.decode("utf8"))
-                exit(1)
-
-        old_percentage = pbar.n
-        pbar.update(100 - old_percentage)
+                    **{"c:v": "copy", "b:a": "192k", "movflags": "+faststart"},
+                ).overwrite_output().run(quiet=True)
+    except ffmpeg.Error as e:
+        print(e.stderr.decode("utf8"))
+        exit(1)
+    old_percentage = pbar.n
+    pbar.update(100 - old_percentage)
     pbar.close()
-    save_data(subreddit, filename + ".mp4", title, idx, background_config["video"][2])
+    save_data(subreddit, filename + ".mp4", title, idx, citation)
     print_step("Removing temporary files 🗑")
     cleanups = cleanup(reddit_id)
     print_substep(f"Removed {cleanups} temporary files 🗑")
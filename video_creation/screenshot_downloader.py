@@ -1,21 +1,217 @@
+import base64
 import json
-import re
+import os
+from collections import deque
+from functools import cache
 from pathlib import Path
-from typing import Dict, Final
+from typing import Dict, Final, List, NamedTuple, Optional
 
-import translators
-from playwright.sync_api import ViewportSize, sync_playwright
+from playwright.sync_api import BrowserContext, CDPSession
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import ViewportSize
 from rich.progress import track
 
 from utils import settings
 from utils.console import print_step, print_substep
 from utils.imagenarator import imagemaker
-from utils.playwright import clear_cookie_by_name
+from utils.playwright import (
+    block_outside_media,
+    browser_pool,
+    cache_static_assets,
+    clear_cookie_by_name,
+)
+from utils.reddit_cards import render_card, render_reddit_cards
+from utils.translate import translate_texts
 from utils.videos import save_data
 
 __all__ = ["get_screenshots_of_reddit_posts"]
 
 
+# Cookies and local storage of the logged in Reddit session, shared by the posts of this run
+_reddit_storage_state = None
+# Where that session is kept between runs, so the login is only done once
+SESSION_PATH: Final = Path("assets/cache/reddit_session.json")
+
+
+class RedditLayout(NamedTuple):
+    """Where the parts of a thread page that get screenshotted or clicked are, on one of
+    Reddit's sites. comment and comment_text are formatted with the comment's id."""
+
+    host: str
+    nsfw_button: str
+    interest_popup: Optional[str]
+    post_content: str
+    post_title: str
+    story_content: str
+    content_gate: Optional[str]
+    comment: str
+    comment_text: str
+
+
+NEW_REDDIT: Final = RedditLayout(
+    host="https://new.reddit.com",
+    nsfw_button="#t3_12hmbug > div > div._3xX726aBn29LDbsDtzr_6E._1Ap4F5maDtT1E1YuCiaO0r.D3IL3FD0RFy_mkKLPwL4 > div > div > button",
+    interest_popup="#SHORTCUT_FOCUSABLE_DIV > div:nth-child(7) > div > div > div > header > div > div._1m0iFpls1wkPZJVo38-LSh > button > i",
+    post_content='[data-test-id="post-content"]',
+    post_title='[data-adclicklocation="title"] > div > div > h1',
+    story_content='[data-click-id="text"]',
+    content_gate='[data-testid="content-gate"]',
+    comment="#t1_{}",
+    comment_text='#t1_{} > div:nth-child(2) > div > div[data-testid="comment"] > div',
+)
+# Rendered on the server, with next to no JavaScript and class names that don't change
+OLD_REDDIT: Final = RedditLayout(
+    host="https://old.reddit.com",
+    nsfw_button='.interstitial button[value="yes"]',
+    interest_popup=None,
+    post_content="div.sitetable.linklisting > div.thing",
+    post_title="div.sitetable.linklisting a.title",
+    story_content="div.sitetable.linklisting .usertext-body",
+    content_gate=None,
+    comment="#thing_t1_{} > div.entry",
+    comment_text="#thing_t1_{} > div.entry .usertext-body .md",
+)
+
+# The screenshots are only read back once, by Pillow, before being encoded into the video, so they
+# are captured as JPEG, which Chromium encodes much faster than PNG. They keep their .png names,
+# Pillow goes by the file's content.
+SCREENSHOT_FORMAT: Final = {"format": "jpeg", "quality": 90}
+
+# The element's box in page coordinates, so it can be captured without being scrolled to, or
+# null if it isn't on the page. Zooming the body doesn't change the properties of the divs, so
+# their box is adjusted for the zoom, the scroll offsets aren't zoomed.
+_BOUNDING_BOX_SCRIPT = """([selector, zoom]) => {
+    const element = document.querySelector(selector);
+    if (!element) return null;
+    const rect = element.getBoundingClientRect();
+    return {
+        x: rect.x * zoom + window.scrollX,
+        y: rect.y * zoom + window.scrollY,
+        width: rect.width * zoom,
+        height: rect.height * zoom,
+    };
+}"""
+
+# Old Reddit has no dark mode, so the theme's colors are forced on it
+_OLD_REDDIT_THEME_SCRIPT = """([background, text]) => document.addEventListener("DOMContentLoaded", () => {
+    const style = document.createElement("style");
+    style.textContent = `body, .thing, .entry, .md, .usertext-body { background: ${background} !important; color: ${text} !important; }
+        a.title, .tagline, .tagline a, .md * { color: ${text} !important; }`;
+    document.head.appendChild(style);
+})"""
+
+# Navigation resets the page's zoom, so it's applied by every new document itself
+_ZOOM_SCRIPT = """(zoom) => document.addEventListener("DOMContentLoaded", () => {
+    document.body.style.zoom = zoom;
+})"""
+
+
+def _css_color(color: tuple) -> str:
+    if len(color) == 4:
+        return f"rgba({color[0]}, {color[1]}, {color[2]}, {color[3] / 255})"
+    return f"rgb({color[0]}, {color[1]}, {color[2]})"
+
+
+@cache
+def _load_cookies(path: str) -> List[dict]:
+    """The preference cookies of a theme, read from disk once per process"""
+    with open(path, encoding="utf-8") as cookie_file:
+        return json.load(cookie_file)
+
+
+def _capture(cdp: CDPSession, page: Page, selector: str, path: str, zoom: float = 1) -> bool:
+    """Screenshots the first element matching selector with one evaluate and one CDP call, instead
+    of the scrolling and measuring round trips of a locator screenshot.
+
+    Returns:
+        bool: False if there is no such element, and so no screenshot
+    """
+    clip = page.evaluate(_BOUNDING_BOX_SCRIPT, [selector, zoom])
+    if clip is None:
+        return False
+    screenshot = cdp.send(
+        "Page.captureScreenshot",
+        {**SCREENSHOT_FORMAT, "clip": {**clip, "scale": 1}, "captureBeyondViewport": True},
+    )
+    Path(path).write_bytes(base64.b64decode(screenshot["data"]))
+    return True
+
+
+def _load_session() -> Optional[dict]:
+    """The session saved by an earlier run, if it belongs to the configured account"""
+    try:
+        saved = json.loads(SESSION_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if saved.get("username") != settings.config["reddit"]["creds"]["username"]:
+        return None
+    return saved.get("storage_state")
+
+
+def _logged_in(context: BrowserContext) -> bool:
+    """Whether the context's cookies still belong to a logged in Reddit session"""
+    try:
+        response = context.request.get("https://www.reddit.com/api/me.json")
+        return response.ok and bool(response.json().get("data", {}).get("name"))
+    except (PlaywrightError, ValueError):
+        return False
+
+
+def _save_session(storage_state: dict):
+    SESSION_PATH.parent.mkdir(parents=True, exist_ok=True)
+    # the cookies are a live login, so only the owner may read them
+    descriptor = os.open(SESSION_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.chmod(SESSION_PATH, 0o600)  # in case an older file was created with a wider mode
+    with os.fdopen(descriptor, "w", encoding="utf-8") as session_file:
+        json.dump(
+            {
+                "username": settings.config["reddit"]["creds"]["username"],
+                "storage_state": storage_state,
+            },
+            session_file,
+        )
+
+
+def _log_in(context, page):
+    """Logs in to Reddit with the configured credentials"""
+    print_substep("Logging in to Reddit...")
+    page.goto("https://www.reddit.com/login", timeout=0)
+    page.set_viewport_size(ViewportSize(width=1920, height=1080))
+    page.wait_for_load_state()
+
+    page.locator(f'input[name="username"]').fill(settings.config["reddit"]["creds"]["username"])
+    page.locator(f'input[name="password"]').fill(settings.config["reddit"]["creds"]["password"])
+    page.get_by_role("button", name="Log In").click()
+    page.wait_for_timeout(5000)
+
+    login_error_div = page.locator(".AnimatedForm__errorMessage").first
+    if login_error_div.is_visible():
+        login_error_message = login_error_div.inner_text()
+        if login_error_message.strip() == "":
+            # The div element is empty, no error
+            pass
+        else:
+            # The div contains an error message
+            print_substep(
+                "Your reddit credentials are incorrect! Please modify them accordingly in the config.toml file.",
+                style="red",
+            )
+            exit()
+    else:
+        pass
+
+    page.wait_for_load_state()
+    # Handle the redesign
+    # Check if the redesign optout cookie is set
+    if page.locator("#redesign-beta-optin-btn").is_visible():
+        # Clear the redesign optout cookie
+        clear_cookie_by_name(context, "redesign_optout")
+        # Reload the page for the redesign to take effect
+        page.reload()
+
+
 def get_screenshots_of_reddit_posts(reddit_object: dict, screenshot_num: int):
     """Downloads screenshots of reddit posts as seen on the web. Downloads to assets/temp/png
 
@@ -30,13 +226,13 @@ def get_screenshots_of_reddit_posts(reddit_object: dict, screenshot_num: int):
     storymode: Final[bool] = settings.config["settings"]["storymode"]
 
     print_step("Downloading screenshots of reddit posts...")
-    reddit_id = re.sub(r"[^\w\s-]", "", reddit_object["thread_id"])
+    reddit_id = reddit_object["safe_thread_id"]
     # ! Make sure the reddit screenshots folder exists
     Path(f"assets/temp/{reddit_id}/png").mkdir(parents=True, exist_ok=True)
 
     # set the theme and disable non-essential cookies
     if settings.config["settings"]["theme"] == "dark":
-        cookie_file = open("./video_creation/data/cookie-dark-mode.json", encoding="utf-8")
+        cookie_path = "./video_creation/data/cookie-dark-mode.json"
         bgcolor = (33, 33, 36, 255)
         txtcolor = (240, 240, 240)
         transparent = False
@@ -46,15 +242,15 @@ def get_screenshots_of_reddit_posts(reddit_object: dict, screenshot_num: int):
             bgcolor = (0, 0, 0, 0)
             txtcolor = (255, 255, 255)
             transparent = True
-            cookie_file = open("./video_creation/data/cookie-dark-mode.json", encoding="utf-8")
+            cookie_path = "./video_creation/data/cookie-dark-mode.json"
         else:
             # Switch to dark theme
-            cookie_file = open("./video_creation/data/cookie-dark-mode.json", encoding="utf-8")
+            cookie_path = "./video_creation/data/cookie-dark-mode.json"
             bgcolor = (33, 33, 36, 255)
             txtcolor = (240, 240, 240)
             transparent = False
     else:
-        cookie_file = open("./video_creation/data/cookie-light-mode.json", encoding="utf-8")
+        cookie_path = "./video_creation/data/cookie-light-mode.json"
         bgcolor = (255, 255, 255, 255)
         txtcolor = (0, 0, 0)
         transparent = False
@@ -69,120 +265,107 @@ def get_screenshots_of_reddit_posts(reddit_object: dict, screenshot_num: int):
             transparent=transparent,
         )
 
-    screenshot_num: int
-    with sync_playwright() as p:
-        print_substep("Launching Headless Browser...")
-
-        browser = p.chromium.launch(
-            headless=True
-        )  # headless=False will show the browser for debugging purposes
-        # Device scale factor (or dsf for short) allows us to increase the resolution of the screenshots
-        # When the dsf is 1, the width of the screenshot is 600 pixels
-        # so we need a dsf such that the width of the screenshot is greater than the final resolution of the video
-        dsf = (W // 600) + 1
-
-        context = browser.new_context(
-            locale=lang or "en-us",
-            color_scheme="dark",
-            viewport=ViewportSize(width=W, height=H),
-            device_scale_factor=dsf,
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36",
-        )
-        cookies = json.load(cookie_file)
-        cookie_file.close()
+    if settings.config["settings"].get("screenshot_mode", "browser") == "local":
+        print_substep("Drawing the post and comments...")
+        render_reddit_cards(reddit_object, screenshot_num, bgcolor, txtcolor, lang)
+        print_substep("Screenshots drawn Successfully.", style="bold green")
+        return
 
-        context.add_cookies(cookies)  # load preference cookies
+    screenshot_num: int
+    global _reddit_storage_state
+    if lang:
+        # the title and every comment in as few requests as possible, before the browser is busy
+        print_substep("Translating post...")
+        texts = [reddit_object["thread_title"]]
+        if not storymode:
+            texts += [
+                comment["comment_body"] for comment in reddit_object["comments"][:screenshot_num]
+            ]
+        translations = translate_texts(texts, lang)
+    print_substep("Launching Headless Browser...")
+    browser = browser_pool.acquire(settings.config["settings"].get("cdp_endpoint", ""))
+    # Device scale factor (or dsf for short) allows us to increase the resolution of the screenshots
+    # When the dsf is 1, the width of the screenshot is 600 pixels
+    # so we need a dsf such that the width of the screenshot is greater than the final resolution of the video
+    dsf = (W // 600) + 1
+
+    saved_session = False
+    if _reddit_storage_state is None:
+        _reddit_storage_state = _load_session()
+        saved_session = _reddit_storage_state is not None
+
+    context = browser.new_context(
+        locale=lang or "en-us",
+        color_scheme="dark",
+        viewport=ViewportSize(width=W, height=H),
+        device_scale_factor=dsf,
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36",
+        # the session of an earlier post or run, so its login can be skipped
+        storage_state=_reddit_storage_state,
+    )
+    try:
+        context.add_cookies(_load_cookies(cookie_path))  # load preference cookies
+        cache_static_assets(context)
+        zoom = settings.config["settings"]["zoom"]
+        if zoom != 1:
+            context.add_init_script(script=f"({_ZOOM_SCRIPT})({json.dumps(zoom)})")
+        layout = OLD_REDDIT if settings.config["settings"].get("old_reddit", False) else NEW_REDDIT
+        if layout is OLD_REDDIT:
+            context.add_init_script(
+                script=f"({_OLD_REDDIT_THEME_SCRIPT})({json.dumps([_css_color(bgcolor), _css_color(txtcolor)])})"
+            )
 
-        # Login to Reddit
-        print_substep("Logging in to Reddit...")
         page = context.new_page()
-        page.goto("https://www.reddit.com/login", timeout=0)
-        page.set_viewport_size(ViewportSize(width=1920, height=1080))
-        page.wait_for_load_state()
-
-        page.locator(f'input[name="username"]').fill(settings.config["reddit"]["creds"]["username"])
-        page.locator(f'input[name="password"]').fill(settings.config["reddit"]["creds"]["password"])
-        page.get_by_role("button", name="Log In").click()
-        page.wait_for_timeout(5000)
-
-        login_error_div = page.locator(".AnimatedForm__errorMessage").first
-        if login_error_div.is_visible():
-            login_error_message = login_error_div.inner_text()
-            if login_error_message.strip() == "":
-                # The div element is empty, no error
-                pass
-            else:
-                # The div contains an error message
-                print_substep(
-                    "Your reddit credentials are incorrect! Please modify them accordingly in the config.toml file.",
-                    style="red",
-                )
-                exit()
-        else:
-            pass
+        cdp_sessions = {page: context.new_cdp_session(page)}
+        if saved_session and not _logged_in(context):
+            # its cookies expired, so it's dropped and the login is done again
+            print_substep("The saved Reddit session has expired.")
+            SESSION_PATH.unlink(missing_ok=True)
+            context.clear_cookies()
+            context.add_cookies(_load_cookies(cookie_path))
+            _reddit_storage_state = None
+        if _reddit_storage_state is None:
+            _log_in(context, page)
+            _reddit_storage_state = context.storage_state()
+            _save_session(_reddit_storage_state)
 
-        page.wait_for_load_state()
-        # Handle the redesign
-        # Check if the redesign optout cookie is set
-        if page.locator("#redesign-beta-optin-btn").is_visible():
-            # Clear the redesign optout cookie
-            clear_cookie_by_name(context, "redesign_optout")
-            # Reload the page for the redesign to take effect
-            page.reload()
         # Get the thread screenshot
-        page.goto(reddit_object["thread_url"], timeout=0)
+        thread_path = reddit_object["thread_url"].split("reddit.com", 1)[1]
+        page.goto(layout.host + thread_path, timeout=0, wait_until="domcontentloaded")
         page.set_viewport_size(ViewportSize(width=W, height=H))
-        page.wait_for_load_state()
-        page.wait_for_timeout(5000)
-
-        if page.locator(
-            "#t3_12hmbug > div > div._3xX726aBn29LDbsDtzr_6E._1Ap4F5maDtT1E1YuCiaO0r.D3IL3FD0RFy_mkKLPwL4 > div > div > button"
-        ).is_visible():
+        try:
+            # waits just until the post, or the NSFW gate in front of it, has rendered
+            page.locator(layout.post_content).first.or_(
+                page.locator(layout.nsfw_button)
+            ).first.wait_for(state="visible", timeout=15000)
+        except PlaywrightTimeoutError:
+            pass  # the screenshot below reports it if the post really isn't there
+
+        if page.locator(layout.nsfw_button).is_visible():
             # This means the post is NSFW and requires to click the proceed button.
 
             print_substep("Post is NSFW. You are spicy...")
-            page.locator(
-                "#t3_12hmbug > div > div._3xX726aBn29LDbsDtzr_6E._1Ap4F5maDtT1E1YuCiaO0r.D3IL3FD0RFy_mkKLPwL4 > div > div > button"
-            ).click()
+            page.locator(layout.nsfw_button).click()
             page.wait_for_load_state()  # Wait for page to fully load
 
             # translate code
-        if page.locator(
-            "#SHORTCUT_FOCUSABLE_DIV > div:nth-child(7) > div > div > div > header > div > div._1m0iFpls1wkPZJVo38-LSh > button > i"
-        ).is_visible():
+        if layout.interest_popup and page.locator(layout.interest_popup).is_visible():
             page.locator(
-                "#SHORTCUT_FOCUSABLE_DIV > div:nth-child(7) > div > div > div > header > div > div._1m0iFpls1wkPZJVo38-LSh > button > i"
+                layout.interest_popup
             ).click()  # Interest popup is showing, this code will close it
 
         if lang:
-            print_substep("Translating post...")
-            texts_in_tl = translators.translate_text(
-                reddit_object["thread_title"],
-                to_language=lang,
-                translator="google",
-            )
-
             page.evaluate(
-                "tl_content => document.querySelector('[data-adclicklocation=\"title\"] > div > div > h1').textContent = tl_content",
-                texts_in_tl,
+                "([selector, tl_content]) => document.querySelector(selector).textContent = tl_content",
+                [layout.post_title, translations[0]],
             )
         else:
             print_substep("Skipping translation...")
 
         postcontentpath = f"assets/temp/{reddit_id}/png/title.png"
         try:
-            if settings.config["settings"]["zoom"] != 1:
-                # store zoom settings
-                zoom = settings.config["settings"]["zoom"]
-                # zoom the body of the page
-                page.evaluate("document.body.style.zoom=" + str(zoom))
-                # as zooming the body doesn't change the properties of the divs, we need to adjust for the zoom
-                location = page.locator('[data-test-id="post-content"]').bounding_box()
-                for i in location:
-                    location[i] = float("{:.2f}".format(location[i] * zoom))
-                page.screenshot(clip=location, path=postcontentpath)
-            else:
-                page.locator('[data-test-id="post-content"]').screenshot(path=postcontentpath)
+            if not _capture(cdp_sessions[page], page, layout.post_content, postcontentpath, zoom):
+                raise RuntimeError("The post isn't on its page")
         except Exception as e:
             print_substep("Something went wrong!", style="red")
             resp = input(
@@ -203,64 +386,103 @@ def get_screenshots_of_reddit_posts(reddit_object: dict, screenshot_num: int):
             raise e
 
         if storymode:
-            page.locator('[data-click-id="text"]').first.screenshot(
-                path=f"assets/temp/{reddit_id}/png/story_content.png"
-            )
-        else:
-            for idx, comment in enumerate(
-                track(
-                    reddit_object["comments"][:screenshot_num],
-                    "Downloading screenshots...",
-                )
+            if not _capture(
+                cdp_sessions[page],
+                page,
+                layout.story_content,
+                f"assets/temp/{reddit_id}/png/story_content.png",
+                zoom,
             ):
-                # Stop if we have reached the screenshot_num
-                if idx >= screenshot_num:
-                    break
-
-                if page.locator('[data-testid="content-gate"]').is_visible():
-                    page.locator('[data-testid="content-gate"] button').click()
-
-                page.goto(f"https://new.reddit.com/{comment['comment_url']}")
-
-                # translate code
+                raise RuntimeError("The post's text isn't on its page")
+        else:
+            comments = reddit_object["comments"][:screenshot_num]
+            # the post's own media was in the title screenshot, the comment pages don't need it
+            block_outside_media(context)
 
-                if settings.config["reddit"]["thread"]["post_lang"]:
-                    comment_tl = translators.translate_text(
-                        comment["comment_body"],
-                        translator="google",
-                        to_language=settings.config["reddit"]["thread"]["post_lang"],
-                    )
-                    page.evaluate(
-                        '([tl_content, tl_id]) => document.querySelector(`#t1_${tl_id} > div:nth-child(2) > div > div[data-testid="comment"] > div`).textContent = tl_content',
-                        [comment_tl, comment["comment_id"]],
-                    )
+            def screenshot_comment(tab, idx: int, comment: dict):
+                path = f"assets/temp/{reddit_id}/png/comment_{idx}.png"
                 try:
-                    if settings.config["settings"]["zoom"] != 1:
-                        # store zoom settings
-                        zoom = settings.config["settings"]["zoom"]
-                        # zoom the body of the page
-                        page.evaluate("document.body.style.zoom=" + str(zoom))
-                        # scroll comment into view
-                        page.locator(f"#t1_{comment['comment_id']}").scroll_into_view_if_needed()
-                        # as zooming the body doesn't change the properties of the divs, we need to adjust for the zoom
-                        location = page.locator(f"#t1_{comment['comment_id']}").bounding_box()
-                        for i in location:
-                            location[i] = float("{:.2f}".format(location[i] * zoom))
-                        page.screenshot(
-                            clip=location,
-                            path=f"assets/temp/{reddit_id}/png/comment_{idx}.png",
-                        )
-                    else:
-                        page.locator(f"#t1_{comment['comment_id']}").screenshot(
-                            path=f"assets/temp/{reddit_id}/png/comment_{idx}.png"
+                    # New Reddit renders the comments after the page's load event
+                    tab.locator(layout.comment.format(comment["comment_id"])).first.wait_for(
+                        state="visible", timeout=15000
+                    )
+                    # translate code
+                    if lang:
+                        tab.evaluate(
+                            "([selector, tl_content]) => { const element = document.querySelector(selector); if (element) element.textContent = tl_content; }",
+                            [
+                                layout.comment_text.format(comment["comment_id"]),
+                                translations[idx + 1],
+                            ],
                         )
-                except TimeoutError:
-                    del reddit_object["comments"]
-                    screenshot_num += 1
-                    print("TimeoutError: Skipping screenshot...")
-                    continue
-
-        # close browser instance when we are done using it
-        browser.close()
+                    captured = _capture(
+                        cdp_sessions[tab],
+                        tab,
+                        layout.comment.format(comment["comment_id"]),
+                        path,
+                        zoom,
+                    )
+                except PlaywrightError as e:
+                    print_substep(f"Screenshotting comment {idx} failed: {e.message}", "red")
+                    captured = False
+                if not captured:
+                    # the comment was deleted or didn't show up in time, its audio is already made, so it's
+                    # drawn as a card instead of leaving the video without its image
+                    print_substep(f"Drawing comment {idx} instead of screenshotting it...")
+                    render_card(
+                        translations[idx + 1] if lang else comment["comment_body"],
+                        path,
+                        bgcolor,
+                        txtcolor,
+                        header=(
+                            f"u/{comment['comment_author']}"
+                            if comment.get("comment_author")
+                            else None
+                        ),
+                    )
+
+            # Comments already on the thread page are screenshotted right there, without
+            # loading their own page
+            remaining = []
+            for idx, comment in enumerate(track(comments, "Downloading screenshots...")):
+                if page.locator(layout.comment.format(comment["comment_id"])).first.is_visible():
+                    screenshot_comment(page, idx, comment)
+                else:
+                    remaining.append((idx, comment))
+
+            # The rest get their own page. Every tab starts loading a comment before any of them
+            # is waited on, and a tab moves on to its next comment as soon as its screenshot is
+            # taken, so the page loads keep overlapping. The sync API can't be used from several
+            # threads, so the tabs are driven one after another from this one.
+            workers = max(
+                1, min(settings.config["settings"].get("screenshot_workers", 4), len(remaining))
+            )
+            tabs = [page] + [context.new_page() for _ in range(workers - 1)]
+            for tab in tabs[1:]:
+                cdp_sessions[tab] = context.new_cdp_session(tab)
+            pending = iter(remaining)
+            loading = deque()
+
+            def load(tab, idx: int, comment: dict):
+                if layout.content_gate and tab.locator(layout.content_gate).is_visible():
+                    tab.locator(f"{layout.content_gate} button").click()
+
+                tab.goto(f"{layout.host}{comment['comment_url']}", wait_until="commit")
+                loading.append((tab, idx, comment))
+
+            for tab, (idx, comment) in zip(tabs, pending):
+                load(tab, idx, comment)
+            for _ in track(range(len(remaining)), "Loading the remaining comments..."):
+                tab, idx, comment = loading.popleft()
+                tab.wait_for_load_state()
+                screenshot_comment(tab, idx, comment)
+                next_comment = next(pending, None)
+                if next_comment is not None:
+                    load(tab, *next_comment)
+
+    finally:
+        # the browser stays open for the next post
+        context.close()
+        browser_pool.release(browser)
 
     print_substep("Screenshots downloaded Successfully.", style="bold green")
@@ -1,29 +1,33 @@
+import importlib
 from typing import Tuple
 
 from rich.console import Console
 
-from TTS.aws_polly import AWSPolly
-from TTS.elevenlabs import elevenlabs
 from TTS.engine_wrapper import TTSEngine
-from TTS.GTTS import GTTS
-from TTS.pyttsx import pyttsx
-from TTS.streamlabs_polly import StreamlabsPolly
-from TTS.TikTok import TikTok
-from TTS.gemini import gemini
 from utils import settings
 from utils.console import print_step, print_table
 
 console = Console()
 
+# "module:class" of each provider, only the chosen one gets imported, so the SDKs of the others
+# (boto3, pyttsx3, google-generativeai, ...) are never loaded
 TTSProviders = {
-    "GoogleTranslate": GTTS,
-    "AWSPolly": AWSPolly,
-    "StreamlabsPolly": StreamlabsPolly,
-    "TikTok": TikTok,
-    "pyttsx": pyttsx,
-    "ElevenLabs": elevenlabs,
-    "Gemini": gemini,
+    "GoogleTranslate": "TTS.GTTS:GTTS",
+    "AWSPolly": "TTS.aws_polly:AWSPolly",
+    "StreamlabsPolly": "TTS.streamlabs_polly:StreamlabsPolly",
+    "TikTok": "TTS.TikTok:TikTok",
+    "pyttsx": "TTS.pyttsx:pyttsx",
+    "ElevenLabs": "TTS.elevenlabs:elevenlabs",
+    "Gemini": "TTS.gemini:gemini",
 }
+# TTSProviders by case-folded name, so the configured voice is matched in a single lookup
+_TTS_BY_CASEFOLD = {name.casefold(): provider for name, provider in TTSProviders.items()}
+
+
+def _load_provider(spec: str):
+    """Imports the TTS provider class of a "module:class" spec"""
+    module, name = spec.split(":")
+    return getattr(importlib.import_module(module), name)
 
 
 def save_text_to_mp3(reddit_obj) -> Tuple[int, int]:
@@ -39,22 +43,12 @@ def save_text_to_mp3(reddit_obj) -> Tuple[int, int]:
     voice = settings.config["settings"]["tts"]["voice_choice"]
     if settings.config["ai"].get("provider", "local") == "gemini":
         voice = "Gemini"
-    if str(voice).casefold() in map(lambda _: _.casefold(), TTSProviders):
-        text_to_mp3 = TTSEngine(get_case_insensitive_key_value(TTSProviders, voice), reddit_obj)
-    else:
-        while True:
-            print_step("Please choose one of the following TTS providers: ")
-            print_table(TTSProviders)
-            choice = input("\n")
-            if choice.casefold() in map(lambda _: _.casefold(), TTSProviders):
-                break
+    tts_engine = _TTS_BY_CASEFOLD.get(str(voice).casefold())
+    while tts_engine is None:
+        print_step("Please choose one of the following TTS providers: ")
+        print_table(TTSProviders)
+        tts_engine = _TTS_BY_CASEFOLD.get(input("\n").casefold())
+        if tts_engine is None:
             print("Unknown Choice")
-        text_to_mp3 = TTSEngine(get_case_insensitive_key_value(TTSProviders, choice), reddit_obj)
+    text_to_mp3 = TTSEngine(_load_provider(tts_engine), reddit_obj)
     return text_to_mp3.run()
-
-
-def get_case_insensitive_key_value(input_dict, key):
-    return next(
-        (value for dict_key, value in input_dict.items() if dict_key.lower() == key.lower()),
-        None,
-    )